@@ -0,0 +1,182 @@
+import sys
+import logging
+import argparse
+import tracemalloc
+from collections import defaultdict
+
+from vision import VisionEngine
+from filter import SignalFilter
+from fsm import GestureFSM
+from controller import TrackpadController
+from input_device import VirtualMouse, NullBackend
+from synthetic import SyntheticHandSource, SCRIPTS
+from metrics import percentile
+import config
+
+logger = logging.getLogger(__name__)
+
+# Allocation profiler for the per-frame hot path.
+# Measures landmark conversion -> FSM -> filter -> VirtualMouse for each frame.
+# Producing the landmarks (the model, here the synthetic source) is not counted.
+#
+# tracemalloc only sees memory that is still live when asked, so two numbers are reported:
+#   transient: peak traced bytes above the frame's starting point (short-lived temporaries)
+#   retained:  bytes still live at the end of the frame, grouped by call site
+
+# Steady-state cursor tracking must stay under this many transient bytes per frame (p99)
+ALLOC_BUDGET_BYTES = 1024
+# More than this many retained bytes per frame means something is accumulating
+RETAINED_LIMIT_BYTES = 16
+
+class SiteTracker:
+    """
+    Attributes transient bytes to call sites by wrapping methods.
+    Peaks are inclusive of nested calls; the outer peak is kept across inner resets.
+    """
+    def __init__(self):
+        self.stack = [] # [start_bytes, peak_bytes] per active call
+        self.peaks = defaultdict(list)
+
+    def enter(self):
+        cur, peak = tracemalloc.get_traced_memory()
+        if self.stack:
+            top = self.stack[-1]
+            top[1] = max(top[1], peak)
+        self.stack.append([cur, cur])
+        tracemalloc.reset_peak()
+
+    def exit(self, name):
+        _, peak = tracemalloc.get_traced_memory()
+        start, top_peak = self.stack.pop()
+        peak = max(top_peak, peak)
+        if self.stack:
+            top = self.stack[-1]
+            top[1] = max(top[1], peak)
+        self.peaks[name].append(peak - start)
+        return peak - start
+
+    def wrap(self, obj, attr, name):
+        fn = getattr(obj, attr)
+        def wrapper(*args, **kwargs):
+            self.enter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.exit(name)
+        setattr(obj, attr, wrapper)
+
+class FrameAllocProfiler:
+    def __init__(self, script='cursor', fps=config.FPS, noise=0.001, seed=0):
+        self.source = SyntheticHandSource(SCRIPTS[script](), fps=fps, noise=noise, seed=seed)
+        self.vision = VisionEngine(mock_source=self.source)
+        f_filter = SignalFilter.from_config()
+        fsm = GestureFSM(debounce_frames=config.DEBOUNCE_FRAMES)
+        self.controller = TrackpadController(fsm, f_filter, VirtualMouse(backend=NullBackend()))
+        self.controller.tap_hold = 0.0
+        # Tick the scroll engine once per frame on this thread so its allocations are counted
+        self.controller.scroll.threaded = False
+
+        # Reused coordinate buffers, as in main
+        self.left_buf = {}
+        self.right_buf = {}
+
+    def _step(self, hands):
+        vision = self.vision
+        left = vision.get_landmarks_dict(hands.get('Left'), config.WIDTH, config.HEIGHT, out=self.left_buf)
+        right = vision.get_landmarks_dict(hands.get('Right'), config.WIDTH, config.HEIGHT, out=self.right_buf)
+        result = self.controller.update(left, right, timestamp=self.source.timestamp)
+        self.controller.scroll.tick(self.source.timestamp)
+        return result
+
+    def instrument(self):
+        """Wrap the hot-path methods so run() also reports transient bytes per call site."""
+        tracker = SiteTracker()
+        c = self.controller
+        tracker.wrap(self.vision, 'get_landmarks_dict', 'VisionEngine.get_landmarks_dict')
+        tracker.wrap(c.fsm, 'update', 'GestureFSM.update')
+        tracker.wrap(c.fsm, '_get_fingers_up', 'GestureFSM._get_fingers_up')
+        tracker.wrap(c.fsm, '_check_swipe', 'GestureFSM._check_swipe')
+        tracker.wrap(c, '_handle_transition', 'TrackpadController._handle_transition')
+        tracker.wrap(c, '_handle_continuous', 'TrackpadController._handle_continuous')
+        tracker.wrap(c.filter, 'process', 'SignalFilter.process')
+        tracker.wrap(c.filter.kalman, 'predict', 'KalmanFilter.predict')
+        tracker.wrap(c.filter.kalman, 'update', 'KalmanFilter.update')
+        tracker.wrap(c.mouse, 'move', 'VirtualMouse.move')
+        tracker.wrap(c.scroll, 'tick', 'ScrollEngine.tick')
+        return tracker
+
+    def run(self, frames, warmup=60, top=10, tracker=None):
+        """Profile `frames` frames after `warmup`. Returns dict of results."""
+        for _ in range(warmup):
+            self._step(self.source.next_frame())
+
+        transient = []
+        tracker = tracker or SiteTracker()
+        tracker.peaks.clear()
+        tracemalloc.start(1)
+        try:
+            before = tracemalloc.take_snapshot()
+            for _ in range(frames):
+                hands = self.source.next_frame()
+                tracker.enter()
+                self._step(hands)
+                transient.append(tracker.exit('frame'))
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+
+        # Only count the pipeline, not tracemalloc, the synthetic source or this profiler
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__),
+                   tracemalloc.Filter(False, "*synthetic.py"),
+                   tracemalloc.Filter(False, __file__)]
+        stats = after.filter_traces(filters).compare_to(before.filter_traces(filters), 'lineno')
+        sites = [s for s in stats if s.size_diff > 0][:top]
+
+        transient.sort()
+        return {
+            'frames': frames,
+            'transient_mean': sum(transient) / frames,
+            'transient_p99': percentile(transient, 99),
+            'transient_max': transient[-1],
+            'retained_per_frame': sum(s.size_diff for s in stats) / frames,
+            'sites': sites,
+            'calls': {name: p for name, p in tracker.peaks.items() if name != 'frame'},
+        }
+
+def print_report(result, budget=ALLOC_BUDGET_BYTES):
+    n = result['frames']
+    print(f"Frames profiled: {n}")
+    print(f"Transient bytes/frame: mean {result['transient_mean']:.0f}, "
+          f"p99 {result['transient_p99']}, max {result['transient_max']} (budget {budget})")
+    print(f"Retained bytes/frame:  {result['retained_per_frame']:.1f}")
+    if result['calls']:
+        print("Transient bytes by call site (inclusive, per call):")
+        for name, peaks in sorted(result['calls'].items(), key=lambda kv: -sum(kv[1])):
+            print(f"  {name:40s} {len(peaks) / n:5.2f} calls/frame  "
+                  f"mean {sum(peaks) / len(peaks):7.0f}  max {max(peaks):6d}")
+    if result['sites']:
+        print("Retained allocations by call site:")
+        for s in result['sites']:
+            frame = s.traceback[0]
+            print(f"  {frame.filename}:{frame.lineno}  +{s.size_diff / n:.1f} B/frame  +{s.count_diff} blocks")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-frame allocation profiler")
+    parser.add_argument('--script', choices=sorted(SCRIPTS), default='cursor')
+    parser.add_argument('--frames', type=int, default=2000)
+    parser.add_argument('--budget', type=int, default=ALLOC_BUDGET_BYTES)
+    parser.add_argument('--sites', action='store_true', help="Break transient bytes down by call site (adds overhead)")
+    parser.add_argument('--check', action='store_true', help="Exit non-zero if p99 transient bytes exceed the budget or memory accumulates")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    profiler = FrameAllocProfiler(script=args.script)
+    tracker = profiler.instrument() if args.sites and not args.check else None
+    result = profiler.run(args.frames, tracker=tracker)
+    print_report(result, args.budget)
+
+    if args.check:
+        ok = result['transient_p99'] <= args.budget and result['retained_per_frame'] < RETAINED_LIMIT_BYTES
+        print("PASS" if ok else "FAIL")
+        sys.exit(0 if ok else 1)
@@ -0,0 +1,230 @@
+import sys
+import json
+import logging
+import argparse
+
+import numpy as np
+
+from session_store import SessionReader, convert_csv, HAND_LEFT, HAND_RIGHT
+
+logger = logging.getLogger(__name__)
+
+# Session analytics over columnar session directories (see session_store.py).
+# Columns are streamed chunk by chunk from np.memmap; only the running
+# totals below are kept in memory, so input size is bounded by disk, not RAM.
+
+class RunStats:
+    """
+    Histogram, transition matrix and dwell times for one enum column.
+    Runs of equal values carry across chunk boundaries but not across sessions.
+    """
+    def __init__(self, names):
+        self.names = names # Global index -> name
+        k = len(names)
+        self.hist = np.zeros(k, dtype=np.int64)
+        self.transitions = np.zeros((k, k), dtype=np.int64)
+        self.dwell_total = np.zeros(k, dtype=np.float64)
+        self.dwell_runs = np.zeros(k, dtype=np.int64)
+        self.dwell_max = np.zeros(k, dtype=np.float64)
+        self.reset()
+
+    def reset(self):
+        """Start a new session: runs do not continue across sessions."""
+        self.prev = None      # Last value of the previous chunk
+        self.prev_t = None
+        self.run_start = None
+
+    def _add_runs(self, values, durations):
+        k = len(self.names)
+        self.dwell_total += np.bincount(values, weights=durations, minlength=k)
+        self.dwell_runs += np.bincount(values, minlength=k)
+        np.maximum.at(self.dwell_max, values, durations)
+
+    def add(self, values, t):
+        """values: global indices (int array), t: timestamps for the same rows."""
+        if len(values) == 0:
+            return
+        k = len(self.names)
+        self.hist += np.bincount(values, minlength=k)
+
+        if self.prev is None:
+            full, tt = values, t
+            self.run_start = t[0]
+        else:
+            # Prepend the carried row so changes at the chunk boundary are seen
+            full = np.concatenate(([self.prev], values))
+            tt = np.concatenate(([self.prev_t], t))
+
+        change = np.flatnonzero(full[1:] != full[:-1]) + 1
+        if len(change):
+            src = full[change - 1]
+            dst = full[change]
+            self.transitions += np.bincount(src * k + dst, minlength=k * k).reshape(k, k)
+
+            ends = tt[change]
+            starts = np.empty(len(change), dtype=np.float64)
+            starts[0] = self.run_start
+            starts[1:] = ends[:-1]
+            self._add_runs(src, ends - starts)
+            self.run_start = ends[-1]
+
+        self.prev = full[-1]
+        self.prev_t = tt[-1]
+
+    def finish_session(self):
+        if self.prev is not None:
+            self._add_runs(np.array([self.prev]), np.array([self.prev_t - self.run_start]))
+        self.reset()
+
+    def summary(self):
+        total = int(self.hist.sum())
+        out = {}
+        for i, name in enumerate(self.names):
+            runs = int(self.dwell_runs[i])
+            out[name] = {
+                'frames': int(self.hist[i]),
+                'fraction': float(self.hist[i]) / total if total else 0.0,
+                'runs': runs,
+                'dwell_total_s': float(self.dwell_total[i]),
+                'dwell_mean_s': float(self.dwell_total[i]) / runs if runs else 0.0,
+                'dwell_max_s': float(self.dwell_max[i]),
+            }
+        return out
+
+class SessionAnalytics:
+    def __init__(self, mode_names, action_names):
+        self.modes = RunStats(mode_names)
+        self.actions = RunStats(action_names)
+        self.mode_index = {n: i for i, n in enumerate(mode_names)}
+        self.action_index = {n: i for i, n in enumerate(action_names)}
+        self.hands = np.zeros(4, dtype=np.int64) # Indexed by presence bits
+        self.frames = 0
+        self.sessions = 0
+        self.duration = 0.0
+
+    def _lut(self, code_names, index):
+        """Lookup table from a session's stored enum codes to global indices."""
+        lut = np.zeros(256, dtype=np.int64)
+        for code, name in code_names.items():
+            lut[code] = index[name]
+        return lut
+
+    def add_session(self, reader, chunk_rows=1 << 20):
+        mode_lut = self._lut(reader.mode_names, self.mode_index)
+        action_lut = self._lut(reader.action_names, self.action_index)
+        first_t = last_t = None
+
+        for chunk in reader.chunks(('timestamp', 'mode', 'action', 'hands'), chunk_rows):
+            t = np.asarray(chunk['timestamp'])
+            self.modes.add(mode_lut[chunk['mode']], t)
+            self.actions.add(action_lut[chunk['action']], t)
+            self.hands += np.bincount(chunk['hands'] & (HAND_LEFT | HAND_RIGHT), minlength=4)
+            if first_t is None:
+                first_t = t[0]
+            last_t = t[-1]
+
+        self.modes.finish_session()
+        self.actions.finish_session()
+        self.frames += reader.count
+        self.sessions += 1
+        if first_t is not None:
+            self.duration += float(last_t - first_t)
+
+    def summary(self):
+        n = self.frames or 1
+        h = self.hands
+        return {
+            'sessions': self.sessions,
+            'frames': self.frames,
+            'duration_s': self.duration,
+            'hands': {
+                'none': float(h[0]) / n,
+                'left_only': float(h[HAND_LEFT]) / n,
+                'right_only': float(h[HAND_RIGHT]) / n,
+                'both': float(h[HAND_LEFT | HAND_RIGHT]) / n,
+                'no_left': float(h[0] + h[HAND_RIGHT]) / n,
+                'no_right': float(h[0] + h[HAND_LEFT]) / n,
+            },
+            'modes': self.modes.summary(),
+            'actions': self.actions.summary(),
+            'mode_transitions': self.modes.transitions.tolist(),
+            'action_transitions': self.actions.transitions.tolist(),
+        }
+
+def _print_runs(title, runs):
+    print(f"\n{title:18s} {'frames':>10s} {'share':>7s} {'runs':>7s} {'dwell mean':>11s} {'dwell max':>10s} {'total':>9s}")
+    for name, r in runs.items():
+        if r['frames'] == 0:
+            continue
+        print(f"{name:18s} {r['frames']:10d} {r['fraction'] * 100:6.1f}% {r['runs']:7d} "
+              f"{r['dwell_mean_s']:10.2f}s {r['dwell_max_s']:9.2f}s {r['dwell_total_s']:8.1f}s")
+
+def _print_matrix(title, names, matrix):
+    used = [i for i, name in enumerate(names) if any(matrix[i]) or any(row[i] for row in matrix)]
+    if not used:
+        return
+    width = max(len(names[i]) for i in used)
+    print(f"\n{title} (row = from, column = to)")
+    print(" " * (width + 1) + " ".join(f"{names[i][:8]:>8s}" for i in used))
+    for i in used:
+        print(f"{names[i]:{width}s} " + " ".join(f"{matrix[i][j]:8d}" for j in used))
+
+def print_summary(s, mode_names, action_names):
+    print(f"Sessions: {s['sessions']}  Frames: {s['frames']}  Duration: {s['duration_s']:.1f}s")
+    h = s['hands']
+    print(f"Hands: both {h['both'] * 100:.1f}%  left only {h['left_only'] * 100:.1f}%  "
+          f"right only {h['right_only'] * 100:.1f}%  none {h['none'] * 100:.1f}%  "
+          f"(no right hand {h['no_right'] * 100:.1f}%)")
+    _print_runs("MODE", s['modes'])
+    _print_runs("ACTION", s['actions'])
+    _print_matrix("Mode transitions", mode_names, s['mode_transitions'])
+    _print_matrix("Action transitions", action_names, s['action_transitions'])
+
+def main(argv=None):
+    from fsm import LeftHandMode, RightHandAction
+
+    parser = argparse.ArgumentParser(description="Gesture session analytics")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_conv = sub.add_parser('convert', help="Convert a CSV gesture log to a session directory")
+    p_conv.add_argument('csv')
+    p_conv.add_argument('session')
+
+    p_stats = sub.add_parser('stats', help="Histograms, dwell times, transitions and hand presence")
+    p_stats.add_argument('sessions', nargs='+', help="Session directories")
+    p_stats.add_argument('--json', action='store_true', help="Print JSON instead of tables")
+    p_stats.add_argument('--chunk-rows', type=int, default=1 << 20)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.command == 'convert':
+        rows, skipped = convert_csv(args.csv, args.session)
+        print(f"Wrote {rows} rows to {args.session} ({skipped} lines skipped)")
+        return 0
+
+    mode_names = [m.name for m in LeftHandMode]
+    action_names = [a.name for a in RightHandAction]
+    stats = SessionAnalytics(mode_names, action_names)
+    for path in args.sessions:
+        reader = SessionReader(path)
+        # Codes are mapped by name, so sessions from other enum versions only fail on unknown names
+        for name in reader.mode_names.values():
+            if name not in stats.mode_index:
+                logger.error(f"{path}: unknown mode {name}")
+                return 1
+        for name in reader.action_names.values():
+            if name not in stats.action_index:
+                logger.error(f"{path}: unknown action {name}")
+                return 1
+        stats.add_session(reader, args.chunk_rows)
+
+    s = stats.summary()
+    if args.json:
+        print(json.dumps(s, indent=2))
+    else:
+        print_summary(s, mode_names, action_names)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+import sys
+import time
+import logging
+from collections import deque
+
+import cv2
+
+from metrics import percentile, SAMPLE_WINDOW
+
+logger = logging.getLogger(__name__)
+
+# Camera capture layer.
+# - Keeps the driver queue as short as possible (buffer size 1, plus draining
+#   queued frames that are known to be stale) so we never process old frames.
+# - Picks the pixel format that delivers frames fastest on this camera.
+# - Stamps each frame with a monotonic capture time, from the V4L2 buffer
+#   timestamp when available, which feeds the filter dt and swipe timing.
+
+# Formats to try, in order of preference when they perform the same
+FOURCC_CANDIDATES = ('MJPG', 'YUYV')
+
+def fourcc_name(value):
+    v = int(value)
+    return "".join(chr((v >> (8 * i)) & 0xFF) for i in range(4)).strip('\x00')
+
+class CameraCapture:
+    """
+    camera_id: cv2 device index
+    fourcc: pixel format to force (e.g. 'MJPG'); None probes FOURCC_CANDIDATES
+    probe_frames: frames timed per format while probing
+    max_drain: most queued frames to skip per read
+    """
+    def __init__(self, camera_id, width, height, fps, fourcc=None, probe_frames=10, max_drain=4):
+        self.camera_id = camera_id
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.max_drain = max_drain
+        # A grab that returns faster than this had a frame already queued
+        self.frame_period = 1.0 / fps
+        self.drain_threshold = 0.25 * self.frame_period
+
+        if sys.platform.startswith('linux'):
+            self.cap = cv2.VideoCapture(camera_id, cv2.CAP_V4L2)
+        else:
+            self.cap = cv2.VideoCapture(camera_id)
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        self.cap.set(cv2.CAP_PROP_FPS, fps)
+        self.buffer_size_set = bool(self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1))
+        if not self.buffer_size_set:
+            logger.info("Camera ignores CAP_PROP_BUFFERSIZE; draining queued frames on read")
+
+        self.hw_timestamps = None # Decided on the first frame
+        self.drained = 0
+        self.frames = 0
+        self.ages = deque(maxlen=SAMPLE_WINDOW) # Capture -> processed, seconds (recent frames)
+        self.age_max = 0.0
+
+        if self.cap.isOpened():
+            self._select_format(fourcc, probe_frames)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def frame_size(self):
+        """(width, height) the camera actually delivers, which may differ from the request."""
+        return int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    def _set_fourcc(self, name):
+        self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*name))
+        return fourcc_name(self.cap.get(cv2.CAP_PROP_FOURCC)) == name
+
+    def _probe(self, frames):
+        """Return (delivered fps, mean retrieve seconds) for the current format."""
+        self.cap.grab() # First frame after a format change is often slow
+        retrieve = 0.0
+        start = time.perf_counter()
+        for _ in range(frames):
+            if not self.cap.grab():
+                return 0.0, float('inf')
+            t = time.perf_counter()
+            ok, _ = self.cap.retrieve()
+            retrieve += time.perf_counter() - t
+            if not ok:
+                return 0.0, float('inf')
+        elapsed = time.perf_counter() - start
+        return frames / elapsed, retrieve / frames
+
+    def _select_format(self, fourcc, probe_frames):
+        if fourcc:
+            if not self._set_fourcc(fourcc):
+                logger.warning(f"Camera does not accept {fourcc}, using {fourcc_name(self.cap.get(cv2.CAP_PROP_FOURCC))}")
+            return
+
+        best = None
+        for name in FOURCC_CANDIDATES:
+            if not self._set_fourcc(name):
+                continue
+            fps, retrieve = self._probe(probe_frames)
+            logger.info(f"Format {name}: {fps:.1f} fps delivered, {retrieve * 1000:.2f} ms decode")
+            # Prefer formats that keep up with the requested rate, then the cheapest decode
+            key = (fps < self.fps * 0.9, retrieve)
+            if best is None or key < best[0]:
+                best = (key, name)
+
+        if best:
+            self._set_fourcc(best[1])
+            logger.info(f"Selected pixel format {best[1]}")
+
+    def _timestamp(self, software_ts):
+        """Monotonic capture time: V4L2 buffer timestamp if plausible, else software_ts."""
+        if self.hw_timestamps is False:
+            return software_ts
+        hw = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        # V4L2 buffer timestamps use CLOCK_MONOTONIC, the same clock as time.monotonic()
+        plausible = 0.0 <= software_ts - hw < 1.0
+        if self.hw_timestamps is None:
+            self.hw_timestamps = plausible
+            logger.info("Using V4L2 buffer timestamps" if plausible else "Using software capture timestamps")
+        return hw if plausible else software_ts
+
+    def _stale(self, now):
+        """
+        Whether the frame just grabbed from the queue should be skipped.
+        With buffer timestamps: only if it is older than one frame period.
+        Without them: only if the driver may hold several frames; a single
+        buffered frame is at most one period old, and waiting for the next
+        one would halve throughput whenever processing exceeds a period.
+        """
+        if self.hw_timestamps:
+            return now - self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0 > self.frame_period
+        return not self.buffer_size_set
+
+    def read(self):
+        """
+        Grab the newest frame, skipping any that were already queued.
+        Returns (ok, frame, capture_ts) with capture_ts on the time.monotonic() clock.
+        """
+        t0 = time.monotonic()
+        if not self.cap.grab():
+            return False, None, None
+        t1 = time.monotonic()
+
+        # An instant grab means that frame sat in the queue; take the next one if it is stale
+        drained = 0
+        while t1 - t0 < self.drain_threshold and drained < self.max_drain and self._stale(t1):
+            t0 = t1
+            if not self.cap.grab():
+                return False, None, None
+            t1 = time.monotonic()
+            drained += 1
+        self.drained += drained
+
+        ok, frame = self.cap.retrieve()
+        if not ok:
+            return False, None, None
+        self.frames += 1
+        return True, frame, self._timestamp(t1)
+
+    def record_age(self, capture_ts):
+        """Record how old a frame was when its processing finished."""
+        age = time.monotonic() - capture_ts
+        self.ages.append(age)
+        if age > self.age_max:
+            self.age_max = age
+
+    def summary(self):
+        if not self.ages:
+            return f"Capture: {self.frames} frames, {self.drained} stale frames drained"
+        s = sorted(self.ages)
+        ms = 1000.0
+        return (f"Capture: {self.frames} frames, {self.drained} stale frames drained, "
+                f"{'V4L2' if self.hw_timestamps else 'software'} timestamps | "
+                f"capture->processed age p50 {percentile(s, 50) * ms:.1f}ms, "
+                f"p99 {percentile(s, 99) * ms:.1f}ms, max {self.age_max * ms:.1f}ms")
+
+    def release(self):
+        self.cap.release()
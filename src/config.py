@@ -6,6 +6,8 @@ CAMERA_ID = 0
 WIDTH = 640
 HEIGHT = 480
 FPS = 30
+CAPTURE_FOURCC = None     # Pixel format, e.g. 'MJPG' or 'YUYV' (None = probe and pick the fastest)
+CAPTURE_PROBE_FRAMES = 10 # Frames timed per format while probing
 
 # Vision
 MAX_NUM_HANDS = 2
@@ -16,12 +18,34 @@ MIN_TRACKING_CONFIDENCE = 0.8  # Increased for better tracking
 FILTER_MIN_CUTOFF = 0.5   # Controls jitter when slow. Keep low for precision.
 FILTER_BETA = 6.0        # Controls lag when moving. Increased for more responsiveness.
 FILTER_D_CUTOFF = 1.0
+FILTER_PROCESS_NOISE = 1e-4      # Kalman: how fast the hand is expected to change velocity
+FILTER_MEASUREMENT_NOISE = 1e-2  # Kalman: how noisy landmarks are
 
 # Input Sensitivity
 # Increased to make movement "easier" (less physical distance needed)
 SENSITIVITY_X = 4.0 
 SENSITIVITY_Y = 4.0
 SCROLL_SENSITIVITY = 1.0 # Faster scrolling
+SCROLL_RATE = 120         # Wheel reports per second (independent of camera FPS)
+SCROLL_SMOOTHING = 0.08   # Hand velocity low-pass time constant (s)
+SCROLL_DECAY = 0.35       # Coasting time constant after release (s)
+SCROLL_DEADBAND = 0.05    # Hand speed (normalized units/s) treated as still
 
 # Gesture
 DEBOUNCE_FRAMES = 5
+
+# Runtime (low-jitter mode)
+LOW_JITTER = False        # Pin threads, raise priority and schedule GC between frames
+RT_PRIORITY = 10          # SCHED_FIFO priority when permitted (0 = don't change)
+RT_CPU_CORES = {}         # e.g. {'capture': [2], 'inference': [3], 'output': [2]}
+GC_WARMUP_FRAMES = 60     # Frames before gc.freeze()
+
+# Multi-session (src/multi_session.py)
+SESSIONS = [              # One entry per station: camera and uinput device name
+    {'camera_id': 0, 'name': "Virtual Trackpad 0"},
+]
+INFERENCE_WORKERS = None  # Inference processes (None = one per CPU core, capped at one per session)
+
+# Gesture Log
+LOG_FORMAT = "csv"                           # "csv" (gesture_logs.txt) or "columnar"
+SESSION_LOG_PATH = "gesture_logs.session"    # Directory for the columnar format
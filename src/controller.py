@@ -0,0 +1,196 @@
+import time
+import logging
+import threading
+
+from fsm import LeftHandMode, RightHandAction
+from input_device import ecodes
+from scroll import ScrollEngine
+import config
+
+logger = logging.getLogger(__name__)
+
+# Actions that move the cursor every frame
+MOVE_ACTIONS = (RightHandAction.CURSOR, RightHandAction.DRAG)
+# Actions that stop scrolling dead instead of letting it coast (fist, clicks)
+SCROLL_STOP_ACTIONS = (RightHandAction.CANCEL, RightHandAction.TAP, RightHandAction.DRAG)
+
+class TrackpadController:
+    """
+    Turns per-frame hand coordinates into mouse/keyboard output.
+    Owns the FSM -> filter -> VirtualMouse path so main, the latency
+    harness and load tests all drive the same logic.
+    """
+    def __init__(self, fsm, f_filter, mouse=None):
+        self.fsm = fsm
+        self.filter = f_filter
+        self.mouse = mouse
+
+        # Filter State
+        self.prev_x, self.prev_y = 0, 0
+
+        # Track previous action to handle state changes (like Click Down/Up)
+        self.last_action = RightHandAction.IDLE
+        self.is_dragging = False # For drag handling
+
+        self.tap_hold = 0.05 # Seconds between TAP press and release
+        # TAP release runs on a timer so the hold never blocks the frame loop
+        self._tap_lock = threading.Lock()
+        self._tap_pending = False
+        self._tap_timer = None
+
+        # Wheel output runs on its own timer (see scroll.py)
+        self.scroll = ScrollEngine(mouse)
+
+    def update(self, left_coords, right_coords, timestamp=None):
+        """
+        Process one frame of landmarks (dicts from VisionEngine.get_landmarks_dict).
+        timestamp: frame time in seconds (defaults to time.time()).
+        Returns (mode, action)
+        """
+        now = timestamp if timestamp is not None else time.time()
+
+        # FSM Update (Pass both)
+        mode, action = self.fsm.update(left_coords, right_coords, timestamp=now)
+
+        # System off (left fist or no left hand): stop scrolling dead, coasting included
+        if mode == LeftHandMode.NEUTRAL:
+            self.scroll.stop()
+
+        self._handle_transition(action, right_coords)
+        self._handle_continuous(action, right_coords, now)
+
+        return mode, action
+
+    def _handle_transition(self, action, right_coords):
+        # 1. State Transition / One-shot triggers
+        if action == self.last_action:
+            return
+
+        mouse = self.mouse
+        last_action = self.last_action
+
+        # Handle Scroll End: coast after release, stop on fist/click (NEUTRAL stops it in update)
+        if action in SCROLL_STOP_ACTIONS:
+            self.scroll.stop()
+        elif last_action == RightHandAction.SCROLL:
+            self.scroll.release()
+
+        # Handle FLICK (Swipe)
+        if action == RightHandAction.FLICK:
+            # Direction is stored on the FSM by _check_swipe
+            direction = getattr(self.fsm, 'swipe_direction', None)
+            if mouse and direction:
+                logger.info(f"Swipe Detected: {direction}")
+                if direction == "RIGHT":
+                    mouse.press_key(ecodes.KEY_RIGHT)
+                elif direction == "LEFT":
+                    mouse.press_key(ecodes.KEY_LEFT)
+                elif direction == "UP":
+                    mouse.press_key(ecodes.KEY_UP)
+                elif direction == "DOWN":
+                    mouse.press_key(ecodes.KEY_DOWN)
+
+        # Handle PUSH
+        if action == RightHandAction.PUSH:
+            if mouse:
+                 logger.info("Push Detected (Space)")
+                 # Only fires once on entry, so holding PUSH will not spam space.
+                 mouse.press_key(ecodes.KEY_SPACE)
+
+        # Handle DRAG Start/End (Pinch)
+        if action == RightHandAction.DRAG:
+            if mouse and not self.is_dragging:
+                self._flush_tap()
+                mouse.click(ecodes.BTN_LEFT, 1)
+                self.is_dragging = True
+                if right_coords:
+                     self.filter.reset(right_coords[8]['x'], right_coords[8]['y'])
+                     self.prev_x = right_coords[8]['x']
+                     self.prev_y = right_coords[8]['y']
+
+        elif last_action == RightHandAction.DRAG:
+           if mouse and self.is_dragging:
+               mouse.click(ecodes.BTN_LEFT, 0)
+               self.is_dragging = False
+
+        # Handle TAP (Micro Tap OR Fist Click)
+        if action == RightHandAction.TAP:
+            if mouse:
+                self._flush_tap()
+                mouse.click(ecodes.BTN_LEFT, 1)
+                if self.tap_hold:
+                    self._tap_pending = True
+                    self._tap_timer = threading.Timer(self.tap_hold, self._release_tap)
+                    self._tap_timer.daemon = True
+                    self._tap_timer.start()
+                else:
+                    mouse.click(ecodes.BTN_LEFT, 0)
+
+        # Handle Cursor Start (reset filter)
+        if action == RightHandAction.CURSOR and last_action != RightHandAction.CURSOR:
+            if right_coords:
+                 self.filter.reset(right_coords[8]['x'], right_coords[8]['y'])
+                 self.prev_x = right_coords[8]['x']
+                 self.prev_y = right_coords[8]['y']
+
+        # Update track
+        self.last_action = action
+
+    def _handle_continuous(self, action, right_coords, now):
+        # 2. Continuous Actions
+        mouse = self.mouse
+        f_filter = self.filter
+
+        if action in MOVE_ACTIONS:
+            # Move Cursor (Index Tip 8)
+            if right_coords:
+                raw_x = right_coords[8]['x']
+                raw_y = right_coords[8]['y']
+
+                dt = now - f_filter.last_time if f_filter.last_time else 1.0/config.FPS
+                f_filter.last_time = now
+
+                sx, sy = f_filter.process(raw_x, raw_y, dt)
+
+                if self.prev_x != 0 and self.prev_y != 0:
+                    dx = (sx - self.prev_x) * 1000 * config.SENSITIVITY_X
+                    dy = (sy - self.prev_y) * 1000 * config.SENSITIVITY_Y
+
+                    if mouse:
+                        mouse.move(dx, dy)
+
+                self.prev_x, self.prev_y = sx, sy
+            else:
+                self.prev_x, self.prev_y = 0, 0
+
+        elif action == RightHandAction.SCROLL:
+            # Vertical Scroll: the engine filters velocity and emits wheel events between frames
+            if right_coords:
+                self.scroll.hand(right_coords[8]['y'], now)
+
+        elif action == RightHandAction.FLICK:
+            pass # Handled in state transition
+
+        elif action == RightHandAction.PUSH:
+            pass # Handled in state transition
+            # IDLE / CANCEL
+            self.prev_x, self.prev_y = 0,0
+            # Filter reset on re-entry handle by state transition check above
+
+    def _release_tap(self):
+        with self._tap_lock:
+            if self._tap_pending:
+                self._tap_pending = False
+                self.mouse.click(ecodes.BTN_LEFT, 0)
+
+    def _flush_tap(self):
+        """Send a pending TAP release now (before the next press, or on close)."""
+        if self._tap_timer is not None:
+            self._tap_timer.cancel()
+            self._tap_timer = None
+            self._release_tap()
+
+    def close(self):
+        """Stop the scroll and TAP timers. Call before closing the mouse."""
+        self.scroll.close()
+        self._flush_tap()
@@ -1,6 +1,13 @@
 
+import math
 import numpy as np
 
+import config
+
+# Lowest cutoff (Hz) used by the One Euro stage; keeps the smoothing factor
+# defined when FILTER_MIN_CUTOFF is 0 and the hand is still
+MIN_CUTOFF_HZ = 1e-3
+
 class KalmanFilter:
     def __init__(self, process_noise=1e-4, measurement_noise=1e-2):
         # State: [x, y, vx, vy]
@@ -27,66 +34,125 @@ class KalmanFilter:
         # Measurement noise covariance
         self.R = np.eye(2, dtype=np.float32) * measurement_noise
 
+        # Preallocated work buffers so predict/update don't create temporaries each frame
+        self.FT = np.ascontiguousarray(self.F.T)
+        self.HT = np.ascontiguousarray(self.H.T)
+        self.I = np.eye(4, dtype=np.float32)
+        self._x = np.zeros(4, dtype=np.float32)       # state temp
+        self._m1 = np.zeros((4, 4), dtype=np.float32) # 4x4 temps
+        self._m2 = np.zeros((4, 4), dtype=np.float32)
+        self._z = np.zeros(2, dtype=np.float32)       # measurement
+        self._hx = np.zeros(2, dtype=np.float32)
+        self._y = np.zeros(2, dtype=np.float32)       # residual
+        self._hp = np.zeros((2, 4), dtype=np.float32)
+        self._S = np.zeros((2, 2), dtype=np.float32)
+        self._S_inv = np.zeros((2, 2), dtype=np.float32)
+        self._pht = np.zeros((4, 2), dtype=np.float32)
+        self._K = np.zeros((4, 2), dtype=np.float32)
+
     def reset(self, x, y):
         """Reset state to specific position with zero velocity."""
-        self.state = np.zeros(4, dtype=np.float32)
+        self.state.fill(0.0)
         self.state[0] = x
         self.state[1] = y
-        self.P = np.eye(4, dtype=np.float32) * 1.0
+        np.copyto(self.P, self.I)
 
     def predict(self):
-        # Predict state
-        self.state = np.dot(self.F, self.state)
-        # Predict error covariance
-        self.P = np.dot(np.dot(self.F, self.P), self.F.T) + self.Q
-        return self.state[:2]
+        """Returns predicted (x, y) as floats."""
+        # Predict state: x = F x
+        np.dot(self.F, self.state, out=self._x)
+        np.copyto(self.state, self._x)
+        # Predict error covariance: P = F P F^T + Q
+        np.dot(self.F, self.P, out=self._m1)
+        np.dot(self._m1, self.FT, out=self._m2)
+        np.add(self._m2, self.Q, out=self.P)
+        return self.state.item(0), self.state.item(1)
 
     def update(self, measurement):
-        # measurement is [x, y]
-        z = np.array(measurement, dtype=np.float32)
-        
-        # Measurement residual
-        y = z - np.dot(self.H, self.state)
-        
-        # Residual covariance
-        S = np.dot(np.dot(self.H, self.P), self.H.T) + self.R
-        
-        # Optimal Kalman gain
-        K = np.dot(np.dot(self.P, self.H.T), np.linalg.inv(S))
-        
-        # Update state estimate
-        self.state = self.state + np.dot(K, y)
-        
-        # Update error covariance
-        I = np.eye(4, dtype=np.float32)
-        self.P = np.dot((I - np.dot(K, self.H)), self.P)
-        
-        return self.state[:2]
+        """measurement is (x, y). Returns corrected (x, y) as floats."""
+        self._z[0] = measurement[0]
+        self._z[1] = measurement[1]
+        
+        # Measurement residual: y = z - H x
+        np.dot(self.H, self.state, out=self._hx)
+        np.subtract(self._z, self._hx, out=self._y)
+        
+        # Residual covariance: S = H P H^T + R
+        np.dot(self.H, self.P, out=self._hp)
+        np.dot(self._hp, self.HT, out=self._S)
+        np.add(self._S, self.R, out=self._S)
+        
+        # 2x2 inverse in closed form (np.linalg.inv allocates)
+        a, b, c, d = self._S.item(0), self._S.item(1), self._S.item(2), self._S.item(3)
+        det = a * d - b * c
+        self._S_inv[0, 0] = d / det
+        self._S_inv[0, 1] = -b / det
+        self._S_inv[1, 0] = -c / det
+        self._S_inv[1, 1] = a / det
+        
+        # Optimal Kalman gain: K = P H^T S^-1
+        np.dot(self.P, self.HT, out=self._pht)
+        np.dot(self._pht, self._S_inv, out=self._K)
+        
+        # Update state estimate: x = x + K y
+        np.dot(self._K, self._y, out=self._x)
+        np.add(self.state, self._x, out=self.state)
+        
+        # Update error covariance: P = (I - K H) P
+        np.dot(self._K, self.H, out=self._m1)
+        np.subtract(self.I, self._m1, out=self._m1)
+        np.dot(self._m1, self.P, out=self._m2)
+        np.copyto(self.P, self._m2)
+        
+        return self.state.item(0), self.state.item(1)
 
 class SignalFilter:
-    def __init__(self, min_cutoff=1.0, beta=40.0, d_cutoff=1.0):
-        # Using a simpler one-euro-filter like approach for adaptive smoothing
-        # combined with Kalman for core state estimation
-        self.kalman = KalmanFilter()
+    def __init__(self, min_cutoff=1.0, beta=40.0, d_cutoff=1.0, process_noise=1e-4, measurement_noise=1e-2):
+        # Kalman for core state estimation, followed by a One Euro filter
+        # for speed-adaptive smoothing
+        self.kalman = KalmanFilter(process_noise=process_noise, measurement_noise=measurement_noise)
         
         self.prev_x = 0.0
         self.prev_y = 0.0
         self.alpha = 0.5
         
         # Adaptive parameters
-        self.min_cutoff = min_cutoff # Minimum cutoff frequency
-        self.beta = beta             # Speed coefficient
-        self.d_cutoff = d_cutoff     # Cutoff for derivative
+        self.min_cutoff = min_cutoff # Minimum cutoff frequency (Hz): jitter at rest
+        self.beta = beta             # Speed coefficient: lag while moving
+        self.d_cutoff = d_cutoff     # Cutoff for derivative (Hz)
+        
+        # Smoothed velocity estimate
+        self.dx = 0.0
+        self.dy = 0.0
         
         self.last_time = None
 
+    @classmethod
+    def from_config(cls):
+        """SignalFilter with the FILTER_* parameters from config.py."""
+        return cls(
+            min_cutoff=config.FILTER_MIN_CUTOFF,
+            beta=config.FILTER_BETA,
+            d_cutoff=config.FILTER_D_CUTOFF,
+            process_noise=config.FILTER_PROCESS_NOISE,
+            measurement_noise=config.FILTER_MEASUREMENT_NOISE
+        )
+
     def reset(self, x, y):
         """Reset filter to a specific position to prevent slewing from 0."""
         self.kalman.reset(x, y)
         self.prev_x = x
         self.prev_y = y
+        self.dx = 0.0
+        self.dy = 0.0
         self.last_time = None
 
+    @staticmethod
+    def _alpha(cutoff, dt):
+        """Smoothing factor of a first-order low-pass with the given cutoff (Hz)."""
+        tau = 1.0 / (2 * math.pi * max(cutoff, MIN_CUTOFF_HZ))
+        return 1.0 / (1.0 + tau / dt)
+
     def process(self, x, y, dt):
         """
         x, y: normalized coordinates
@@ -94,22 +160,22 @@ class SignalFilter:
         """
         # First pass: Kalman Filter for prediction and noise reduction
         kx, ky = self.kalman.predict()
-        kx, ky = self.kalman.update([x, y])
-        
-        # Second pass: Adaptive Exponential Smoothing
-        # Calculate velocity based on filtered Kalman output
-        dx = (kx - self.prev_x) / dt if dt > 0 else 0
-        dy = (ky - self.prev_y) / dt if dt > 0 else 0
-        velocity = np.sqrt(dx*dx + dy*dy)
-        
-        # Adaptive alpha based on speed
-        # Higher speed -> higher alpha (less latency)
-        # Lower speed -> lower alpha (more smooth)
-        # Simple adaptive logic:
-        # alpha = base_alpha + (velocity * gain) clamped to [0.01, 0.9]
-        
-        target_alpha = 0.05 + (velocity * 0.1)
-        self.alpha = max(0.01, min(0.8, target_alpha))
+        kx, ky = self.kalman.update((x, y))
+        
+        if dt <= 0:
+            return self.prev_x, self.prev_y
+        
+        # Second pass: One Euro filter
+        # Velocity of the Kalman output, low-passed at d_cutoff
+        a_d = self._alpha(self.d_cutoff, dt)
+        self.dx = a_d * (kx - self.prev_x) / dt + (1 - a_d) * self.dx
+        self.dy = a_d * (ky - self.prev_y) / dt + (1 - a_d) * self.dy
+        velocity = math.sqrt(self.dx*self.dx + self.dy*self.dy)
+        
+        # Cutoff rises with speed:
+        # slow -> min_cutoff (more smoothing), fast -> less lag
+        cutoff = self.min_cutoff + self.beta * velocity
+        self.alpha = self._alpha(cutoff, dt)
         
         # Apply smoothing
         sx = self.alpha * kx + (1 - self.alpha) * self.prev_x
@@ -20,6 +20,64 @@ class RightHandAction(Enum):
     PUSH = auto()
     CANCEL = auto()
 
+# Finger tip/PIP landmark ids checked by _get_fingers_up, in report order
+FINGER_INDICES = (
+    ('Index', 6, 8),
+    ('Middle', 10, 12),
+    ('Ring', 14, 16),
+    ('Pinky', 18, 20),
+)
+FINGER_NAMES = ('Index', 'Middle', 'Ring', 'Pinky', 'Thumb')
+
+# Every possible result of _get_fingers_up, indexed by bitmask (bit i = FINGER_NAMES[i]),
+# so the per-frame check returns a shared tuple instead of building a list.
+_FINGER_COMBOS = tuple(
+    tuple(name for i, name in enumerate(FINGER_NAMES) if mask & (1 << i))
+    for mask in range(1 << len(FINGER_NAMES))
+)
+
+class SwipeHistory:
+    """
+    Fixed-size ring buffer of (timestamp, x, y) samples for swipe detection.
+    Preallocated so appending each frame does not create tuples or shift a list.
+    """
+    __slots__ = ('size', 'count', 'head', 't', 'x', 'y')
+
+    def __init__(self, size):
+        self.size = size
+        self.t = [0.0] * size
+        self.x = [0.0] * size
+        self.y = [0.0] * size
+        self.clear()
+
+    def clear(self):
+        self.count = 0
+        self.head = 0 # Index of the oldest sample
+
+    def append(self, t, x, y):
+        if self.count < self.size:
+            i = (self.head + self.count) % self.size
+            self.count += 1
+        else:
+            # Full: overwrite the oldest
+            i = self.head
+            self.head = (self.head + 1) % self.size
+        self.t[i] = t
+        self.x[i] = x
+        self.y[i] = y
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, k):
+        """Return sample k as (t, x, y); negative k counts from the newest."""
+        if k < 0:
+            k += self.count
+        if not 0 <= k < self.count:
+            raise IndexError("SwipeHistory index out of range")
+        i = (self.head + k) % self.size
+        return self.t[i], self.x[i], self.y[i]
+
 class GestureFSM:
     def __init__(self, debounce_frames=5):
         self.mode = LeftHandMode.NEUTRAL
@@ -31,17 +89,21 @@ class GestureFSM:
         self.pending_mode_frames = 0
         
         # Swipe Logic
-        self.rh_history = [] # List of (timestamp, x, y)
         self.HISTORY_LENGTH = 10 # Frames to keep for analysis (approx 300ms at 30fps)
+        self.rh_history = SwipeHistory(self.HISTORY_LENGTH) # (timestamp, x, y) samples
         self.last_swipe_time = 0
         self.SWIPE_COOLDOWN = 0.5 # Seconds
         self.pending_push_frames = 0
+        self.now = 0.0 # Timestamp of the frame being processed
 
-    def update(self, left_landmarks, right_landmarks):
+    def update(self, left_landmarks, right_landmarks, timestamp=None):
         """
         Update state based on both hands.
+        timestamp: frame time in seconds (defaults to time.time()). Drives swipe kinematics.
         Returns (mode, action)
         """
+        self.now = timestamp if timestamp is not None else time.time()
+
         # 1. Determine Left Hand Mode
         target_mode = self._detect_left_mode(left_landmarks)
         
@@ -61,11 +123,9 @@ class GestureFSM:
         # Update History for Swipe
         if right_landmarks:
             cx, cy = right_landmarks[9]['px'], right_landmarks[9]['py'] # Use MCP/Palm center for stability
-            self.rh_history.append((time.time(), cx, cy))
-            if len(self.rh_history) > self.HISTORY_LENGTH:
-                self.rh_history.pop(0)
+            self.rh_history.append(self.now, cx, cy)
         else:
-            self.rh_history = []
+            self.rh_history.clear()
 
         # 2. Determine Right Hand Action (Allowed by Mode)
         # If Mode is NEUTRAL, Action is forced IDLE
@@ -163,7 +223,7 @@ class GestureFSM:
 
     def _check_swipe(self):
         if len(self.rh_history) < 3: return None
-        if time.time() - self.last_swipe_time < self.SWIPE_COOLDOWN: return None
+        if self.now - self.last_swipe_time < self.SWIPE_COOLDOWN: return None
         
         # Get start and end
         t_start, x_start, y_start = self.rh_history[0]
@@ -190,7 +250,7 @@ class GestureFSM:
             if abs(dx) / (abs(dy) + 1) < ratio_threshold: return None 
             
             # Valid Swipe
-            self.last_swipe_time = time.time()
+            self.last_swipe_time = self.now
             # Invert Left/Right? Camera is mirrored?
             # Main.py mirrors frame: frame = cv2.flip(frame, 1)
             # So Left on screen is Left in world.
@@ -201,35 +261,29 @@ class GestureFSM:
             # Vertical
             if abs(dy) / (abs(dx) + 1) < ratio_threshold: return None
             
-            self.last_swipe_time = time.time()
+            self.last_swipe_time = self.now
             self.swipe_direction = "DOWN" if dy > 0 else "UP"
             return RightHandAction.FLICK
 
     def _get_fingers_up(self, coords):
-        # ... (Existing logic same)
-        fingers = []
-        finger_indices = {
-            'Index': (6, 8),
-            'Middle': (10, 12),
-            'Ring': (14, 16),
-            'Pinky': (18, 20)
-        }
-        
+        """Return a tuple of raised finger names (shared, do not modify)."""
+        mask = 0
         wrist = coords[0]
+        wx, wy = wrist['x'], wrist['y']
         
-        for name, (pip_idx, tip_idx) in finger_indices.items():
+        for bit, (name, pip_idx, tip_idx) in enumerate(FINGER_INDICES):
             tip = coords[tip_idx]
             pip = coords[pip_idx]
-            d_tip = (tip['x']-wrist['x'])**2 + (tip['y']-wrist['y'])**2
-            d_pip = (pip['x']-wrist['x'])**2 + (pip['y']-wrist['y'])**2
+            d_tip = (tip['x']-wx)**2 + (tip['y']-wy)**2
+            d_pip = (pip['x']-wx)**2 + (pip['y']-wy)**2
             if d_tip > d_pip * 1.05: 
-                fingers.append(name)
+                mask |= 1 << bit
         
-        d_tip = (coords[4]['x']-coords[0]['x'])**2 + (coords[4]['y']-coords[0]['y'])**2
-        d_ip = (coords[3]['x']-coords[0]['x'])**2 + (coords[3]['y']-coords[0]['y'])**2
+        d_tip = (coords[4]['x']-wx)**2 + (coords[4]['y']-wy)**2
+        d_ip = (coords[3]['x']-wx)**2 + (coords[3]['y']-wy)**2
         d_tip_index = (coords[4]['x']-coords[5]['x'])**2 + (coords[4]['y']-coords[5]['y'])**2
         
         if d_tip > d_ip * 1.1 and d_tip_index > 0.005: 
-             fingers.append('Thumb')
+             mask |= 1 << 4 # Thumb
              
-        return fingers
+        return _FINGER_COMBOS[mask]
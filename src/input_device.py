@@ -1,14 +1,121 @@
 import platform
 import logging
+import time
+import threading
+from collections import Counter
 
 logger = logging.getLogger(__name__)
 
+try:
+    from evdev import ecodes
+except ImportError:
+    # Minimal subset of evdev.ecodes so event backends work without evdev installed
+    class ecodes:
+        EV_SYN = 0x00
+        EV_KEY = 0x01
+        EV_REL = 0x02
+        SYN_REPORT = 0
+        REL_X = 0x00
+        REL_Y = 0x01
+        REL_WHEEL = 0x08
+        REL_WHEEL_HI_RES = 0x0b
+        BTN_LEFT = 272
+        BTN_RIGHT = 273
+        KEY_SPACE = 57
+        KEY_UP = 103
+        KEY_LEFT = 105
+        KEY_RIGHT = 106
+        KEY_DOWN = 108
+
+# Older evdev releases predate the hi-res wheel code
+REL_WHEEL_HI_RES = getattr(ecodes, 'REL_WHEEL_HI_RES', 0x0b)
+WHEEL_NOTCH = 120 # REL_WHEEL_HI_RES units per REL_WHEEL notch
+
+# Readable names for the events VirtualMouse emits (used in reports)
+EVENT_NAMES = {
+    (ecodes.EV_SYN, ecodes.SYN_REPORT): 'SYN_REPORT',
+    (ecodes.EV_REL, ecodes.REL_X): 'REL_X',
+    (ecodes.EV_REL, ecodes.REL_Y): 'REL_Y',
+    (ecodes.EV_REL, ecodes.REL_WHEEL): 'REL_WHEEL',
+    (ecodes.EV_REL, REL_WHEEL_HI_RES): 'REL_WHEEL_HI_RES',
+    (ecodes.EV_KEY, ecodes.BTN_LEFT): 'BTN_LEFT',
+    (ecodes.EV_KEY, ecodes.BTN_RIGHT): 'BTN_RIGHT',
+    (ecodes.EV_KEY, ecodes.KEY_LEFT): 'KEY_LEFT',
+    (ecodes.EV_KEY, ecodes.KEY_RIGHT): 'KEY_RIGHT',
+    (ecodes.EV_KEY, ecodes.KEY_UP): 'KEY_UP',
+    (ecodes.EV_KEY, ecodes.KEY_DOWN): 'KEY_DOWN',
+    (ecodes.EV_KEY, ecodes.KEY_SPACE): 'KEY_SPACE',
+}
+
+class OutputBackend:
+    """
+    Event sink interface for VirtualMouse, modelled on evdev.UInput.
+    Any object with write/syn/close (including UInput itself) can be used.
+    """
+    def write(self, etype, code, value):
+        raise NotImplementedError
+
+    def syn(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class NullBackend(OutputBackend):
+    """Discards all events. For load tests and profiling."""
+    def write(self, etype, code, value):
+        pass
+
+    def syn(self):
+        pass
+
+class RecordingBackend(OutputBackend):
+    """
+    In-memory loopback sink. Timestamps every event and SYN with `clock`
+    so tests and benchmarks can inspect exactly what would reach the OS.
+    """
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.events = [] # List of (timestamp, type, code, value)
+
+    def write(self, etype, code, value):
+        self.events.append((self.clock(), etype, code, value))
+
+    def syn(self):
+        self.events.append((self.clock(), ecodes.EV_SYN, ecodes.SYN_REPORT, 0))
+
+    def clear(self):
+        self.events = []
+
+    def counts(self):
+        """Return Counter of event names (e.g. {'REL_X': 10, 'SYN_REPORT': 10})."""
+        c = Counter()
+        for _, etype, code, _ in self.events:
+            c[EVENT_NAMES.get((etype, code), f"{etype}:{code}")] += 1
+        return c
+
 class VirtualMouse:
-    def __init__(self):
+    def __init__(self, backend=None, name="Virtual Trackpad"):
+        """
+        backend: optional OutputBackend. If None, uses uinput on Linux
+                 and pyautogui on Windows/MacOS.
+        name: uinput device name (one device per session in multi-session mode)
+        """
         self.os = platform.system()
         self.impl = None
+        self.e = ecodes
+        # Event mode: impl is a uinput-style sink (write/syn/close)
+        self.event_mode = False
+        # Serializes reports: the scroll engine writes from its own thread
+        self.lock = threading.Lock()
+        self.wheel_remainder = 0 # Hi-res units not yet sent as a whole notch
         
-        if self.os == 'Linux':
+        if backend is not None:
+            self.impl = backend
+            self.event_mode = True
+            logger.info(f"Initialized {type(backend).__name__} Input")
+                
+        elif self.os == 'Linux':
             try:
                 import evdev
                 from evdev import UInput, ecodes as e
@@ -16,11 +123,12 @@ class VirtualMouse:
                 self.e = e
                 # Add Keyboard Capabilities
                 cap = {
-                    e.EV_REL: (e.REL_X, e.REL_Y, e.REL_WHEEL),
+                    e.EV_REL: (e.REL_X, e.REL_Y, e.REL_WHEEL, REL_WHEEL_HI_RES),
                     e.EV_KEY: (e.BTN_LEFT, e.BTN_RIGHT, 
                                e.KEY_LEFT, e.KEY_RIGHT, e.KEY_UP, e.KEY_DOWN, e.KEY_SPACE),
                 }
-                self.impl = UInput(cap, name="Virtual Trackpad", version=0x3)
+                self.impl = UInput(cap, name=name, version=0x3)
+                self.event_mode = True
                 logger.info("Initialized Linux evdev Input")
             except Exception as ex:
                 logger.error(f"Failed to init Linux Input: {ex}")
@@ -39,10 +147,11 @@ class VirtualMouse:
         """Move mouse relative by dx, dy."""
         if not self.impl: return
 
-        if self.os == 'Linux':
-            self.impl.write(self.e.EV_REL, self.e.REL_X, int(dx))
-            self.impl.write(self.e.EV_REL, self.e.REL_Y, int(dy))
-            self.impl.syn()
+        if self.event_mode:
+            with self.lock:
+                self.impl.write(self.e.EV_REL, self.e.REL_X, int(dx))
+                self.impl.write(self.e.EV_REL, self.e.REL_Y, int(dy))
+                self.impl.syn()
         else:
             # PyAutoGUI moveRel
             self.pyautogui.moveRel(dx, dy, _pause=False)
@@ -51,13 +160,34 @@ class VirtualMouse:
         """Scroll wheel."""
         if not self.impl: return
         
-        if self.os == 'Linux':
-            self.impl.write(self.e.EV_REL, self.e.REL_WHEEL, int(dy))
-            self.impl.syn()
+        if self.event_mode:
+            with self.lock:
+                self.impl.write(self.e.EV_REL, self.e.REL_WHEEL, int(dy))
+                self.impl.syn()
         else:
              # PyAutoGUI scroll (amount varies by OS, usually 10 clicks)
              self.pyautogui.scroll(int(dy * 10), _pause=False)
 
+    def scroll_hi_res(self, units):
+        """
+        Scroll by `units` 1/120ths of a notch (REL_WHEEL_HI_RES).
+        Whole notches are also sent as REL_WHEEL for clients without hi-res support.
+        """
+        if not self.impl: return
+
+        with self.lock:
+            self.wheel_remainder += units
+            notches = int(self.wheel_remainder / WHEEL_NOTCH) # Toward zero, both directions
+            self.wheel_remainder -= notches * WHEEL_NOTCH
+
+            if self.event_mode:
+                self.impl.write(self.e.EV_REL, REL_WHEEL_HI_RES, int(units))
+                if notches:
+                    self.impl.write(self.e.EV_REL, self.e.REL_WHEEL, notches)
+                self.impl.syn()
+            elif notches:
+                self.pyautogui.scroll(notches * 10, _pause=False)
+
     def click(self, button, value):
         """
         button: e.BTN_LEFT or e.BTN_RIGHT (Mapped manually for windows)
@@ -65,9 +195,10 @@ class VirtualMouse:
         """
         if not self.impl: return
 
-        if self.os == 'Linux':
-             self.impl.write(self.e.EV_KEY, button, value)
-             self.impl.syn()
+        if self.event_mode:
+             with self.lock:
+                 self.impl.write(self.e.EV_KEY, button, value)
+                 self.impl.syn()
         else:
             # Map button
             btn_str = 'left'
@@ -88,11 +219,12 @@ class VirtualMouse:
         """
         if not self.impl: return
         
-        if self.os == 'Linux':
-            self.impl.write(self.e.EV_KEY, key_code, 1) # Down
-            self.impl.syn()
-            self.impl.write(self.e.EV_KEY, key_code, 0) # Up
-            self.impl.syn()
+        if self.event_mode:
+            with self.lock:
+                self.impl.write(self.e.EV_KEY, key_code, 1) # Down
+                self.impl.syn()
+                self.impl.write(self.e.EV_KEY, key_code, 0) # Up
+                self.impl.syn()
         else:
             # Map evdev key codes to pyautogui strings
             # This requires knowing the integer values of evdev keys if we import them in main
@@ -112,6 +244,6 @@ class VirtualMouse:
             if k:
                 self.pyautogui.press(k)
     def close(self):
-        if self.os == 'Linux' and self.impl and hasattr(self.impl, 'close'):
+        if self.event_mode and self.impl and hasattr(self.impl, 'close'):
             self.impl.close()
         # Windows/Mac PyAutoGUI doesn't need explicit close
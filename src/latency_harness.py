@@ -0,0 +1,190 @@
+import time
+import logging
+import argparse
+from collections import Counter, defaultdict
+
+from vision import VisionEngine
+from filter import SignalFilter
+from fsm import GestureFSM
+from controller import TrackpadController
+from input_device import VirtualMouse, RecordingBackend, EVENT_NAMES, WHEEL_NOTCH
+from synthetic import SyntheticHandSource, ReplayHandSource, SCRIPTS, save_frames
+from metrics import percentile
+import config
+
+logger = logging.getLogger(__name__)
+
+# End-to-end input latency harness.
+# Drives vision (mock) -> FSM -> filter -> VirtualMouse into a RecordingBackend
+# and measures the time from a frame's landmarks arriving to each event being emitted.
+# Needs no camera, model or /dev/uinput access.
+
+class LatencyReport:
+    """Per-gesture event counts and emission latency samples (seconds)."""
+    def __init__(self):
+        self.frames = Counter()            # action -> frames
+        self.output_frames = Counter()     # action -> frames that emitted at least one event
+        self.events = defaultdict(Counter) # action -> event name -> count
+        self.first_event = defaultdict(list) # action -> latency to first event of the frame
+        self.syn = defaultdict(list)         # action -> latency to each SYN_REPORT
+        self.frame_time = []                 # total processing time per frame
+
+    def add_frame(self, action, arrival, events, done):
+        name = action.name
+        self.frames[name] += 1
+        self.frame_time.append(done - arrival)
+        if not events:
+            return
+        self.output_frames[name] += 1
+        self.first_event[name].append(events[0][0] - arrival)
+        for ts, etype, code, _ in events:
+            ev_name = EVENT_NAMES.get((etype, code), f"{etype}:{code}")
+            self.events[name][ev_name] += 1
+            if ev_name == 'SYN_REPORT':
+                self.syn[name].append(ts - arrival)
+
+    @staticmethod
+    def _fmt(samples):
+        if not samples:
+            return "-"
+        s = sorted(samples)
+        us = 1e6
+        return (f"p50 {percentile(s, 50) * us:7.1f}  p90 {percentile(s, 90) * us:7.1f}  "
+                f"p99 {percentile(s, 99) * us:7.1f}  max {s[-1] * us:8.1f} us")
+
+    def print(self):
+        total = sum(self.frames.values())
+        print(f"Frames: {total}   processing {self._fmt(self.frame_time)}")
+        for name in sorted(self.frames):
+            print(f"\n{name}: {self.frames[name]} frames, {self.output_frames[name]} with output")
+            if self.events[name]:
+                counts = ", ".join(f"{k}={v}" for k, v in sorted(self.events[name].items()))
+                print(f"  events:      {counts}")
+                print(f"  first event: {self._fmt(self.first_event[name])}")
+                print(f"  SYN:         {self._fmt(self.syn[name])}")
+
+def wheel_report(events):
+    """
+    Wheel output measured from recorded events: report rate and interval
+    jitter, and how many events each notch of scrolling cost.
+    """
+    times = []
+    hi_res = notches = events_total = 0
+    frame_events = 0
+    frame_wheel = False
+    for ts, etype, code, value in events:
+        name = EVENT_NAMES.get((etype, code))
+        frame_events += 1
+        if name == 'REL_WHEEL_HI_RES':
+            hi_res += abs(value)
+            frame_wheel = True
+        elif name == 'REL_WHEEL':
+            notches += abs(value)
+            frame_wheel = True
+        elif name == 'SYN_REPORT':
+            if frame_wheel:
+                times.append(ts)
+                events_total += frame_events
+            frame_events = 0
+            frame_wheel = False
+
+    if not times:
+        return None
+    intervals = sorted(b - a for a, b in zip(times, times[1:]))
+    span = times[-1] - times[0]
+    distance = hi_res / WHEEL_NOTCH if hi_res else notches
+    return {
+        'reports': len(times),
+        'rate': (len(times) - 1) / span if span > 0 else 0.0,
+        'intervals': intervals,
+        'events': events_total,
+        'notches': distance,
+        'events_per_notch': events_total / distance if distance else 0.0,
+    }
+
+def print_wheel_report(w):
+    ms = 1000.0
+    iv = w['intervals']
+    print(f"\nWheel output: {w['reports']} reports at {w['rate']:.1f}/s, "
+          f"{w['notches']:.1f} notches, {w['events']} events ({w['events_per_notch']:.2f} events/notch)")
+    if iv:
+        print(f"  interval:    p50 {percentile(iv, 50) * ms:.2f}  p99 {percentile(iv, 99) * ms:.2f}  "
+              f"max {iv[-1] * ms:.2f} ms")
+
+def run(source, frames=None, tap_hold=0.0, realtime=False):
+    """
+    Drive the full pipeline from a hand source into a recording sink.
+    realtime: pace frames by their timestamps, so timer-driven output (scroll) runs as it would live.
+    Returns (LatencyReport, RecordingBackend).
+    """
+    backend = RecordingBackend()
+    mouse = VirtualMouse(backend=backend)
+    vision = VisionEngine(mock_source=source)
+    f_filter = SignalFilter.from_config()
+    fsm = GestureFSM(debounce_frames=config.DEBOUNCE_FRAMES)
+    controller = TrackpadController(fsm, f_filter, mouse)
+    controller.tap_hold = tap_hold
+
+    report = LatencyReport()
+    n = 0
+    wall_start = source_start = None
+    while (frames is None or n < frames) and not source.finished:
+        hands = vision.process(None)
+        if realtime:
+            if wall_start is None:
+                wall_start, source_start = time.perf_counter(), source.timestamp
+            delay = (source.timestamp - source_start) - (time.perf_counter() - wall_start)
+            if delay > 0:
+                time.sleep(delay)
+        arrival = backend.clock()
+        first = len(backend.events)
+
+        left_coords = vision.get_landmarks_dict(hands.get('Left'), config.WIDTH, config.HEIGHT)
+        right_coords = vision.get_landmarks_dict(hands.get('Right'), config.WIDTH, config.HEIGHT)
+        mode, action = controller.update(left_coords, right_coords, timestamp=source.timestamp)
+
+        done = backend.clock()
+        report.add_frame(action, arrival, backend.events[first:], done)
+        n += 1
+
+    controller.close()
+    return report, backend
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end input latency harness (no uinput needed)")
+    parser.add_argument('--script', choices=sorted(SCRIPTS), default='demo')
+    parser.add_argument('--replay', help="JSON lines landmark file to replay instead of a script")
+    parser.add_argument('--dump', help="Write the synthetic frames to this file and exit")
+    parser.add_argument('--fps', type=float, default=config.FPS)
+    parser.add_argument('--frames', type=int, default=None, help="Frame limit (default: one pass of the script)")
+    parser.add_argument('--noise', type=float, default=0.001)
+    parser.add_argument('--dropout', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tap-hold', type=float, default=0.0, help="TAP press/release delay (main uses 0.05)")
+    parser.add_argument('--realtime', action='store_true',
+                        help="Run at the source frame rate (needed for meaningful wheel timing)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.replay:
+        source = ReplayHandSource(args.replay, loop=args.frames is not None)
+    else:
+        source = SyntheticHandSource(SCRIPTS[args.script](), fps=args.fps, noise=args.noise,
+                                     dropout=args.dropout, seed=args.seed,
+                                     loop=args.frames is not None)
+
+    if args.dump:
+        n = save_frames(source, args.dump, args.frames)
+        print(f"Wrote {n} frames to {args.dump}")
+    else:
+        start = time.perf_counter()
+        report, backend = run(source, args.frames, tap_hold=args.tap_hold, realtime=args.realtime)
+        elapsed = time.perf_counter() - start
+        report.print()
+        wheel = wheel_report(backend.events)
+        if wheel:
+            print_wheel_report(wheel)
+            if not args.realtime:
+                print("  (frames were not paced; use --realtime for wheel timing)")
+        print(f"\nWall time {elapsed:.3f}s")
@@ -3,10 +3,13 @@ import time
 import sys
 import numpy as np
 import logging
-import evdev # Added missing import
 from vision import VisionEngine
 from filter import SignalFilter
 from fsm import GestureFSM, LeftHandMode, RightHandAction
+from controller import TrackpadController
+from capture import CameraCapture
+from realtime import RealtimeRuntime, JitterMonitor
+from session_store import SessionWriter
 try:
     from input_device import VirtualMouse
 except ImportError:
@@ -18,6 +21,11 @@ import config
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Per-frame text is built once: overlay labels per state, CSV row as a %-format
+MODE_LABELS = {m: f"Mode: {m.name}" for m in LeftHandMode}
+ACTION_LABELS = {a: f"Action: {a.name}" for a in RightHandAction}
+LOG_LINE = "%.6f,%s,%s,%.3f,%.3f,%.3f,%.3f\n"
+
 def main():
     logger.info("Starting Virtual Trackpad System...")
     
@@ -28,11 +36,7 @@ def main():
             min_detection_confidence=config.MIN_DETECTION_CONFIDENCE,
             min_tracking_confidence=config.MIN_TRACKING_CONFIDENCE
         )
-        f_filter = SignalFilter(
-            min_cutoff=config.FILTER_MIN_CUTOFF,
-            beta=config.FILTER_BETA,
-            d_cutoff=config.FILTER_D_CUTOFF
-        )
+        f_filter = SignalFilter.from_config()
         fsm = GestureFSM(debounce_frames=config.DEBOUNCE_FRAMES)
         
         if VirtualMouse:
@@ -54,10 +58,9 @@ def main():
         return
 
     # Open Camera
-    cap = cv2.VideoCapture(config.CAMERA_ID)
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, config.WIDTH)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, config.HEIGHT)
-    cap.set(cv2.CAP_PROP_FPS, config.FPS)
+    # (latest-frame-only, fastest pixel format, monotonic capture timestamps)
+    cap = CameraCapture(config.CAMERA_ID, config.WIDTH, config.HEIGHT, config.FPS,
+                        fourcc=config.CAPTURE_FOURCC, probe_frames=config.CAPTURE_PROBE_FRAMES)
     
     if not cap.isOpened():
         logger.error("Could not open camera.")
@@ -65,23 +68,41 @@ def main():
 
     logger.info("System Ready. Use 'q' to quit.")
 
-    # Filter State
-    prev_x, prev_y = 0, 0
+    controller = TrackpadController(fsm, f_filter, mouse)
     
-    # Track previous action to handle state changes (like Click Down/Up)
-    last_action = RightHandAction.IDLE
-    is_dragging = False # For drag handling
+    # Low-jitter runtime. Capture, inference and output all run on this thread.
+    runtime = RealtimeRuntime(
+        enabled=config.LOW_JITTER,
+        cores=config.RT_CPU_CORES,
+        priority=config.RT_PRIORITY,
+        warmup_frames=config.GC_WARMUP_FRAMES,
+        frame_period=1.0/config.FPS
+    )
+    runtime.setup_thread('inference')
+    controller.scroll.thread_setup = lambda: runtime.setup_thread('output')
+    jitter = JitterMonitor(frame_period=1.0/config.FPS)
     
-    # Open Log File
-    log_file = open("gesture_logs.txt", "w")
-    log_file.write("Timestamp,Mode,Action,Left_X,Left_Y,Right_X,Right_Y\n")
+    # Reused per-frame landmark buffers (refilled by get_landmarks_dict)
+    left_buf = {}
+    right_buf = {}
+    last_status = None
+    
+    # Open Log File (CSV text or columnar session, see session_store.py)
+    log_file = None
+    session_log = None
+    if config.LOG_FORMAT == 'columnar':
+        session_log = SessionWriter(config.SESSION_LOG_PATH)
+    else:
+        log_file = open("gesture_logs.txt", "w")
+        log_file.write("Timestamp,Mode,Action,Left_X,Left_Y,Right_X,Right_Y\n")
     
     try:
         while True:
-            start_time = time.time()
-            ret, frame = cap.read()
+            ret, frame, capture_ts = cap.read()
             if not ret:
                 break
+            jitter.tick()
+            runtime.frame_start()
             
             # mirror frame
             frame = cv2.flip(frame, 1)
@@ -94,22 +115,28 @@ def main():
             right_coords = None
             
             if 'Left' in hands:
-                left_coords = vision.get_landmarks_dict(hands['Left'], config.WIDTH, config.HEIGHT)
+                left_coords = vision.get_landmarks_dict(hands['Left'], config.WIDTH, config.HEIGHT, out=left_buf)
             if 'Right' in hands:
-                right_coords = vision.get_landmarks_dict(hands['Right'], config.WIDTH, config.HEIGHT)
+                right_coords = vision.get_landmarks_dict(hands['Right'], config.WIDTH, config.HEIGHT, out=right_buf)
             
-            # FSM Update (Pass both)
-            mode, action = fsm.update(left_coords, right_coords)
+            # FSM Update + Action Handling (Pass both)
+            # Capture time drives the filter dt and swipe timing, not processing time
+            mode, action = controller.update(left_coords, right_coords, timestamp=capture_ts)
+            cap.record_age(capture_ts)
             
             # Logging
-            lx, ly = (left_coords[8]['x'], left_coords[8]['y']) if left_coords else (0,0)
-            rx, ry = (right_coords[8]['x'], right_coords[8]['y']) if right_coords else (0,0)
-            log_line = f"{time.time()},{mode.name},{action.name},{lx:.3f},{ly:.3f},{rx:.3f},{ry:.3f}\n"
-            log_file.write(log_line)
+            if session_log:
+                session_log.append(time.time(), mode, action,
+                                   (left_coords[8]['x'], left_coords[8]['y']) if left_coords else None,
+                                   (right_coords[8]['x'], right_coords[8]['y']) if right_coords else None)
+            else:
+                lx, ly = (left_coords[8]['x'], left_coords[8]['y']) if left_coords else (0,0)
+                rx, ry = (right_coords[8]['x'], right_coords[8]['y']) if right_coords else (0,0)
+                log_file.write(LOG_LINE % (time.time(), mode.name, action.name, lx, ly, rx, ry))
             
             # Visual Overlay
-            cv2.putText(frame, f"Mode: {mode.name}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-            cv2.putText(frame, f"Action: {action.name}", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+            cv2.putText(frame, MODE_LABELS[mode], (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+            cv2.putText(frame, ACTION_LABELS[action], (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
             
             if left_coords:
                  cv2.circle(frame, (left_coords[8]['px'], left_coords[8]['py']), 5, (0, 255, 0), -1)
@@ -118,127 +145,14 @@ def main():
             
             cv2.imshow("Virtual Trackpad Debug", frame)
             
-            # Debug: Print detected hands
-            print(f"Hands: {list(hands.keys())} | Mode: {mode.name} | Action: {action.name}      ", end='\r')
+            # Debug: Print detected hands (only when something changed)
+            status = (left_coords is not None, right_coords is not None, mode, action)
+            if status != last_status:
+                last_status = status
+                print(f"Hands: {list(hands.keys())} | Mode: {mode.name} | Action: {action.name}      ", end='\r')
             
-            # --- ACTION HANDLING ---
-            
-            # 1. State Transition / One-shot triggers
-            if action != last_action:
-                pass 
-                
-                # Handle FLICK (Swipe)
-                if action == RightHandAction.FLICK:
-                    # Determine direction from FSM
-                    # We need to access fsm.swipe_direction which we set in fsm._check_swipe
-                    # BUT fsm object in main loop is generic.
-                    # We should probably return data from FSM or access attribute.
-                    # Let's assume we can access fsm.swipe_direction
-                    direction = getattr(fsm, 'swipe_direction', None)
-                    if mouse and direction:
-                        logger.info(f"Swipe Detected: {direction}")
-                        if direction == "RIGHT":
-                            mouse.press_key(evdev.ecodes.KEY_RIGHT)
-                        elif direction == "LEFT":
-                            mouse.press_key(evdev.ecodes.KEY_LEFT)
-                        elif direction == "UP":
-                            mouse.press_key(evdev.ecodes.KEY_UP)
-                        elif direction == "DOWN":
-                            mouse.press_key(evdev.ecodes.KEY_DOWN)
-
-                # Handle PUSH
-                if action == RightHandAction.PUSH:
-                    if mouse:
-                         logger.info("Push Detected (Space)")
-                         mouse.press_key(evdev.ecodes.KEY_SPACE)
-                         # Add delay to prevent spam? One-shot is handled by state transition.
-                         # PUSH state might persist if hand stays open?
-                         # Ideally PUSH should be a momentary trigger or we need debouncing.
-                         # Since this block is `if action != last_action`, it only fires ONCE on entry.
-                         # So holding PUSH will not spam space. Correct.
-
-                # Handle DRAG Start/End (Pinch)
-                if action == RightHandAction.DRAG:
-                    if mouse and not is_dragging:
-                        mouse.click(evdev.ecodes.BTN_LEFT, 1)
-                        is_dragging = True
-                        if right_coords:
-                             f_filter.reset(right_coords[8]['x'], right_coords[8]['y'])
-                             prev_x = right_coords[8]['x']
-                             prev_y = right_coords[8]['y']
-                             
-                elif last_action == RightHandAction.DRAG:
-                   if mouse and is_dragging:
-                       mouse.click(evdev.ecodes.BTN_LEFT, 0)
-                       is_dragging = False
-
-                # Handle TAP (Micro Tap OR Fist Click)
-                if action == RightHandAction.TAP:
-                    if mouse:
-                        mouse.click(evdev.ecodes.BTN_LEFT, 1)
-                        time.sleep(0.05) 
-                        mouse.click(evdev.ecodes.BTN_LEFT, 0)
-                        
-                # Handle Cursor Start (reset filter)
-                if action == RightHandAction.CURSOR and last_action != RightHandAction.CURSOR:
-                    if right_coords:
-                         f_filter.reset(right_coords[8]['x'], right_coords[8]['y'])
-                         prev_x = right_coords[8]['x']
-                         prev_y = right_coords[8]['y']
-                
-                # Update track
-                last_action = action
-
-            # 2. Continuous Actions
-            
-            if action in [RightHandAction.CURSOR, RightHandAction.DRAG]:
-                # Move Cursor (Index Tip 8)
-                if right_coords:
-                    raw_x = right_coords[8]['x']
-                    raw_y = right_coords[8]['y']
-                    
-                    dt = time.time() - f_filter.last_time if f_filter.last_time else 1.0/config.FPS
-                    f_filter.last_time = time.time()
-                    
-                    sx, sy = f_filter.process(raw_x, raw_y, dt)
-                    
-                    if prev_x != 0 and prev_y != 0:
-                        dx = (sx - prev_x) * 1000 * config.SENSITIVITY_X
-                        dy = (sy - prev_y) * 1000 * config.SENSITIVITY_Y
-                        
-                        if mouse:
-                            mouse.move(dx, dy)
-                    
-                    prev_x, prev_y = sx, sy
-                else:
-                    prev_x, prev_y = 0, 0
-            
-            elif action == RightHandAction.SCROLL:
-                # Vertical Scroll
-                if right_coords:
-                    raw_y = right_coords[8]['y']
-                    
-                    if prev_y != 0:
-                         dy = (raw_y - prev_y) * 1000
-                         if abs(dy) > 2.0: # threshold
-                             if mouse:
-                                 # Invert? usually up hand = scroll up
-                                 mouse.scroll(dy * config.SCROLL_SENSITIVITY)
-                    
-                    prev_y = raw_y
-                    # Reset X
-                    prev_x = right_coords[8]['x']
-                else:
-                    prev_y = 0
-
-            elif action == RightHandAction.FLICK:
-                pass # Handled in state transition
-            
-            elif action == RightHandAction.PUSH:
-                pass # Handled in state transition
-                # IDLE / CANCEL
-                prev_x, prev_y = 0,0
-                # Filter reset on re-entry handle by state transition check above
+            # Idle slot before the next frame
+            runtime.frame_end()
             
             # Check key
             if cv2.waitKey(1) & 0xFF == ord('q'):
@@ -251,9 +165,17 @@ def main():
     finally:
         cap.release()
         cv2.destroyAllWindows()
-        log_file.close()
+        if session_log:
+            session_log.close()
+        else:
+            log_file.close()
+        controller.close()
         if mouse:
             mouse.close()
+        runtime.close()
+        jitter.close()
+        logger.info(jitter.summary())
+        logger.info(cap.summary())
         logger.info("Clean Exit.")
 
 if __name__ == "__main__":
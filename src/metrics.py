@@ -0,0 +1,12 @@
+# Small helpers shared by the runtime monitors and the benchmark tools.
+
+# Most recent samples a long-running monitor keeps for percentile summaries
+# (bounded so a daemon's memory does not grow with uptime)
+SAMPLE_WINDOW = 10000
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted sequence (0.0 if empty)."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, int(round(p / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[k]
@@ -0,0 +1,506 @@
+import os
+import time
+import queue
+import logging
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory, resource_tracker
+
+import numpy as np
+
+from filter import SignalFilter
+from fsm import GestureFSM
+from controller import TrackpadController
+
+from metrics import percentile, SAMPLE_WINDOW
+from realtime import RealtimeRuntime
+import config
+
+logger = logging.getLogger(__name__)
+
+# Multi-session mode: several cameras on one machine.
+# Each camera has its own capture thread, output thread, FSM, filter and uinput device.
+# Inference runs on shared worker processes. A session stays on the worker that
+# ran its previous frame while that worker is free, so its MediaPipe tracking
+# state sees consecutive frames; otherwise it moves to any free worker.
+# Frames are passed through shared memory and dispatched by a fair,
+# deadline-aware scheduler.
+
+# --- Inference worker (runs in pool processes) ---
+
+_worker = {}
+
+def _init_worker(max_num_hands, min_detection_confidence, min_tracking_confidence, mock_cost):
+    _worker['params'] = (max_num_hands, min_detection_confidence, min_tracking_confidence)
+    _worker['mock_cost'] = mock_cost
+    _worker['engines'] = {} # session_id -> VisionEngine (one per session this worker has served)
+    _worker['shm'] = {}     # shm name -> SharedMemory
+
+def _engine(session_id):
+    engine = _worker['engines'].get(session_id)
+    if engine is None:
+        from vision import VisionEngine
+        max_hands, det, track = _worker['params']
+        engine = VisionEngine(max_num_hands=max_hands, min_detection_confidence=det,
+                              min_tracking_confidence=track)
+        _worker['engines'][session_id] = engine
+    return engine
+
+def _warm(session_ids):
+    """Build this worker's engines up front so the first frames don't pay for it."""
+    for session_id in session_ids:
+        _engine(session_id)
+
+def _frame_view(shm_name, slot, shape):
+    shm = _worker['shm'].get(shm_name)
+    if shm is None:
+        shm = shared_memory.SharedMemory(name=shm_name)
+        # The owning process unlinks it; stop this process's tracker from doing so too
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        _worker['shm'][shm_name] = shm
+    size = shape[0] * shape[1] * shape[2]
+    return np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=slot * size)
+
+def _infer(session_id, shm_name, slot, shape, synthetic_hands):
+    """
+    Run hand tracking on one frame. Returns (session_id, coords, inference_seconds)
+    where coords is {'Left': dict, 'Right': dict} from get_landmarks_dict.
+    synthetic_hands: landmarks from a SyntheticHandSource to use instead of the model.
+    """
+    start = time.perf_counter()
+    engine = _engine(session_id)
+    height, width = shape[0], shape[1]
+
+    if synthetic_hands is not None:
+        # Emulate model cost so scheduling and scaling can be measured without a model.
+        # Spin on CPU time, not wall time, so workers compete for cores like real inference.
+        deadline = time.process_time() + _worker['mock_cost']
+        while time.process_time() < deadline:
+            pass
+        hands = synthetic_hands
+    else:
+        hands = engine.process(_frame_view(shm_name, slot, shape))
+
+    coords = {}
+    for label, lm in hands.items():
+        coords[label] = engine.get_landmarks_dict(lm, width, height)
+    return session_id, coords, time.perf_counter() - start
+
+# --- Sessions ---
+
+class SessionStats:
+    """Per-session counters; timing samples keep the last `window` frames."""
+    def __init__(self, window=SAMPLE_WINDOW):
+        self.latency = deque(maxlen=window)    # capture -> output done
+        self.queue_wait = deque(maxlen=window) # capture -> dispatch
+        self.inference = deque(maxlen=window)
+        self.latency_max = 0.0
+        self.frames = 0
+        self.dropped = 0    # overwritten by a newer frame before dispatch
+        self.missed = 0     # finished after the deadline, or inference failed
+        self.moved = 0      # dispatched to a different worker than the previous frame
+
+class Session:
+    """One camera -> FSM -> filter -> uinput device chain."""
+    SLOTS = 2 # Double buffer: capture writes one slot while the other is in flight
+
+    def __init__(self, session_id, camera_id, mouse, source=None, width=config.WIDTH, height=config.HEIGHT, fps=config.FPS):
+        self.id = session_id
+        self.camera_id = camera_id
+        self.source = source # SyntheticHandSource instead of a camera
+        self.shape = (height, width, 3)
+        self.fps = fps
+
+        f_filter = SignalFilter.from_config()
+        fsm = GestureFSM(debounce_frames=config.DEBOUNCE_FRAMES)
+        self.mouse = mouse
+        self.controller = TrackpadController(fsm, f_filter, mouse)
+        self.stats = SessionStats()
+        self.outbox = queue.Queue() # Finished inference results, in frame order
+        self.worker = 0             # Inference worker that ran the previous frame
+
+        self.shm = None
+        self._allocate_slots(self.shape)
+
+        self.lock = threading.Lock()
+        self.pending = None        # (slot, capture_ts, synthetic_hands) of the newest undispatched frame
+        self.waiting_since = None  # capture time of the oldest frame waiting since last dispatch
+        self.last_dispatch = 0.0   # when the previous frame was dispatched (scheduler tie-break)
+        self.inflight_slot = None
+        self.inflight_ts = None
+        self.cap = None
+
+    def _allocate_slots(self, shape):
+        if self.shm is not None:
+            self.slots = []
+            self.shm.close()
+            self.shm.unlink()
+        self.shape = shape
+        frame_size = shape[0] * shape[1] * shape[2]
+        self.shm = shared_memory.SharedMemory(create=True, size=frame_size * self.SLOTS)
+        self.slots = [np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf, offset=i * frame_size)
+                      for i in range(self.SLOTS)]
+
+    def open(self):
+        if self.source is not None:
+            return True
+        from capture import CameraCapture
+        self.cap = CameraCapture(self.camera_id, self.shape[1], self.shape[0], self.fps,
+                                 fourcc=config.CAPTURE_FOURCC, probe_frames=config.CAPTURE_PROBE_FRAMES)
+        if not self.cap.isOpened():
+            return False
+        # Size shared memory to what the camera delivers, not what was requested
+        width, height = self.cap.frame_size()
+        if (height, width) != self.shape[:2]:
+            logger.warning(f"Session {self.id}: camera {self.camera_id} delivers {width}x{height}, "
+                           f"not {self.shape[1]}x{self.shape[0]}")
+            self._allocate_slots((height, width, 3))
+        return True
+
+    def capture_loop(self, running, events, runtime):
+        """Capture thread: write the newest frame into a free slot and notify the scheduler."""
+        import cv2
+        runtime.setup_thread('capture')
+        next_time = time.monotonic()
+        while running.is_set():
+            hands = None
+            if self.source is not None:
+                # Pace synthetic frames at the camera rate
+                next_time += 1.0 / self.fps
+                delay = next_time - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                hands = self.source.next_frame()
+                frame = None
+                ts = time.monotonic()
+            else:
+                ret, frame, ts = self.cap.read()
+                if not ret:
+                    logger.error(f"Session {self.id}: camera {self.camera_id} stopped")
+                    break
+                if frame.shape != self.shape:
+                    # cv2.flip would silently allocate instead of writing to shared memory
+                    logger.error(f"Session {self.id}: camera {self.camera_id} frame shape changed to "
+                                 f"{frame.shape}, expected {self.shape}; stopping session")
+                    break
+
+            with self.lock:
+                slot = 0 if self.inflight_slot != 0 else 1
+                if frame is not None:
+                    # Mirror straight into shared memory
+                    cv2.flip(frame, 1, dst=self.slots[slot])
+                if self.pending is not None:
+                    self.stats.dropped += 1
+                self.pending = (slot, ts, hands)
+                if self.waiting_since is None:
+                    self.waiting_since = ts
+            events.put(('frame', self.id))
+
+    def take_pending(self):
+        """Claim the pending frame for dispatch. Returns (slot, ts, hands) or None."""
+        with self.lock:
+            if self.pending is None or self.inflight_slot is not None:
+                return None
+            frame = self.pending
+            self.pending = None
+            self.waiting_since = None
+            self.last_dispatch = time.monotonic()
+            self.inflight_slot = frame[0]
+            self.inflight_ts = frame[1]
+            return frame
+
+    def finish(self, coords, inference_time):
+        """Hand a completed frame to this session's output thread and free its slot."""
+        capture_ts = self.inflight_ts
+        with self.lock:
+            self.inflight_slot = None
+        self.outbox.put((coords, inference_time, capture_ts))
+
+    def fail(self):
+        """Inference raised for the in-flight frame: free its slot and count it as missed."""
+        capture_ts = self.inflight_ts
+        with self.lock:
+            self.inflight_slot = None
+        self.outbox.put((None, 0.0, capture_ts))
+
+    def output_loop(self, running, runtime, deadline):
+        """
+        Output thread: run this session's FSM/filter/output in frame order.
+        Output never blocks the dispatcher; a slow update only delays this session.
+        """
+        runtime.setup_thread('output')
+        stats = self.stats
+        while running.is_set() or not self.outbox.empty():
+            try:
+                coords, inference_time, capture_ts = self.outbox.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if coords is None:
+                stats.missed += 1 # Inference failed, see Session.fail
+                continue
+            self.controller.update(coords.get('Left'), coords.get('Right'), timestamp=capture_ts)
+
+            latency = time.monotonic() - capture_ts
+            stats.frames += 1
+            stats.latency.append(latency)
+            stats.inference.append(inference_time)
+            if latency > stats.latency_max:
+                stats.latency_max = latency
+            if latency > deadline:
+                stats.missed += 1
+
+    def close(self):
+        if self.cap is not None:
+            logger.info(f"Session {self.id}: {self.cap.summary()}")
+            self.cap.release()
+        self.controller.close()
+        if self.mouse:
+            self.mouse.close()
+        self.slots = []
+        self.shm.close()
+        self.shm.unlink()
+        self.shm = None
+
+class DeadlineScheduler:
+    """
+    Earliest-deadline-first over sessions. A session's deadline is measured from
+    the oldest frame it has had waiting since its last dispatch, so a session
+    whose pending frame keeps being replaced by newer ones cannot starve.
+    Cameras run in step, so deadlines within `tie` seconds of the earliest
+    count as equal and go to the session served least recently; otherwise
+    capture order would decide them the same way every time. Any free worker
+    serves the most urgent session, so sessions get equal service however
+    many share a worker. Each session has at most one frame in flight,
+    keeping its FSM in order.
+    """
+    def __init__(self, sessions, deadline, tie=0.0):
+        self.sessions = sessions
+        self.deadline = deadline
+        self.tie = tie
+
+    def pick(self, worker_free):
+        """
+        Most urgent session with a pending frame, and the worker to run it on:
+        its previous worker if that is free (keeps tracking state), else the
+        first free one (worker_free[i]). Returns (session, worker) or (None, None).
+        """
+        if not any(worker_free):
+            return None, None
+        ready = []
+        for s in self.sessions:
+            with s.lock:
+                if s.pending is None or s.inflight_slot is not None:
+                    continue
+                ready.append((s.waiting_since + self.deadline, s))
+        if not ready:
+            return None, None
+        earliest = min(due for due, _ in ready)
+        best = min((s for due, s in ready if due <= earliest + self.tie), key=lambda s: s.last_dispatch)
+        if worker_free[best.worker]:
+            return best, best.worker
+        return best, worker_free.index(True)
+
+class MultiSessionRunner:
+    """
+    Sessions start round-robin on single-process workers and stay on a worker
+    while it is free when their next frame is due, so an engine's tracking
+    state is usually built from that camera's consecutive frames. A session
+    whose worker is busy moves to a free one (its tracking restarts there)
+    rather than leaving that worker idle. A worker whose process dies is
+    retired and its sessions move to the others.
+    """
+    def __init__(self, sessions, workers=None, deadline=None, mock_cost=0.0):
+        self.sessions = {s.id: s for s in sessions}
+        # More workers than sessions would sit idle
+        self.workers = min(workers or os.cpu_count() or 1, max(1, len(sessions)))
+        self.deadline = deadline or 2.0 / config.FPS
+        self.scheduler = DeadlineScheduler(sessions, self.deadline, tie=0.5 / config.FPS)
+        self.events = queue.Queue()
+        self.running = threading.Event()
+        self.pools = [
+            ProcessPoolExecutor(
+                max_workers=1,
+                initializer=_init_worker,
+                initargs=(config.MAX_NUM_HANDS, config.MIN_DETECTION_CONFIDENCE,
+                          config.MIN_TRACKING_CONFIDENCE, mock_cost)
+            )
+            for _ in range(self.workers)
+        ]
+        for i, s in enumerate(sessions):
+            s.worker = i % self.workers
+        self.worker_free = [True] * self.workers
+        self.futures = {} # in-flight future -> (session, worker)
+        self.retired = set() # workers whose process died
+        self.completed = 0
+        self.elapsed = 0.0
+
+        # Low-jitter thread roles: capture threads, this dispatcher ('inference') and scroll output
+        self.runtime = RealtimeRuntime(
+            enabled=config.LOW_JITTER,
+            cores=config.RT_CPU_CORES,
+            priority=config.RT_PRIORITY,
+            frame_period=1.0/config.FPS
+        )
+        for s in sessions:
+            s.controller.scroll.thread_setup = lambda: self.runtime.setup_thread('output')
+
+    def _on_done(self, future):
+        self.events.put(('result', future))
+
+    def _dispatch(self):
+        while True:
+            s, worker = self.scheduler.pick(self.worker_free)
+            if s is None:
+                return
+            frame = s.take_pending()
+            if frame is None:
+                continue
+            slot, ts, hands = frame
+            s.stats.queue_wait.append(time.monotonic() - ts)
+            if worker != s.worker:
+                s.stats.moved += 1
+                s.worker = worker
+            self.worker_free[worker] = False
+            try:
+                future = self.pools[worker].submit(_infer, s.id, s.shm.name, slot, s.shape, hands)
+            except BrokenProcessPool:
+                self._retire(worker)
+                s.fail()
+                continue
+            self.futures[future] = (s, worker)
+            future.add_done_callback(self._on_done)
+
+    def _retire(self, worker):
+        """Stop dispatching to a worker whose process died (worker_free stays False)."""
+        if worker not in self.retired:
+            self.retired.add(worker)
+            logger.error(f"Inference worker {worker} died; its sessions move to the remaining workers")
+
+    def _complete(self, future):
+        """Deliver a finished inference to its session. A failure only costs that frame."""
+        s, worker = self.futures.pop(future)
+        try:
+            _, coords, inference_time = future.result()
+        except BrokenProcessPool:
+            self._retire(worker)
+            s.fail()
+            return
+        except Exception as e:
+            logger.error(f"Session {s.id}: inference failed on worker {worker}: {e}")
+            self.worker_free[worker] = True
+            s.fail()
+            return
+        self.worker_free[worker] = True
+        s.finish(coords, inference_time)
+        self.completed += 1
+
+    def run(self, duration=None):
+        """
+        Run until `duration` seconds pass or Ctrl-C.
+        Returns False if a camera failed to open or every inference worker died.
+        """
+        threads = []
+        start = time.monotonic()
+        try:
+            for s in self.sessions.values():
+                if not s.open():
+                    logger.error(f"Session {s.id}: could not open camera {s.camera_id}")
+                    return False
+
+            # Start the workers and their engines before the cameras so the first frames don't wait.
+            # Sessions can move between workers, so every worker builds an engine for each.
+            warm = [pool.submit(_warm, list(self.sessions)) for pool in self.pools]
+            for f in warm:
+                f.result()
+
+            self.runtime.setup_thread('inference')
+            self.running.set()
+            threads = [threading.Thread(target=s.capture_loop, args=(self.running, self.events, self.runtime),
+                                        daemon=True)
+                       for s in self.sessions.values()]
+            threads += [threading.Thread(target=s.output_loop, args=(self.running, self.runtime, self.deadline),
+                                         daemon=True)
+                        for s in self.sessions.values()]
+            for t in threads:
+                t.start()
+
+            start = time.monotonic()
+            while duration is None or time.monotonic() - start < duration:
+                try:
+                    kind, item = self.events.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if kind == 'result':
+                    self._complete(item)
+                self._dispatch()
+                if len(self.retired) == self.workers:
+                    logger.error("No inference workers left; stopping")
+                    return False
+            return True
+        except KeyboardInterrupt:
+            logger.info("Stopping...")
+            return True
+        finally:
+            self.elapsed = time.monotonic() - start
+            self.running.clear()
+            for t in threads:
+                t.join(timeout=1.0)
+            for pool in self.pools:
+                pool.shutdown(wait=True)
+            for s in self.sessions.values():
+                s.close()
+
+    def report(self):
+        ms = 1000.0
+        print(f"{len(self.sessions)} sessions, {self.workers} workers: "
+              f"{self.completed} frames in {self.elapsed:.1f}s ({self.completed / self.elapsed:.1f} frames/s)")
+        for s in self.sessions.values():
+            st = s.stats
+            lat = sorted(st.latency)
+            wait = sorted(st.queue_wait)
+            inf = sorted(st.inference)
+            print(f"  session {s.id} (camera {s.camera_id}): {st.frames} frames, "
+                  f"{st.frames / self.elapsed:.1f} fps, dropped {st.dropped}, deadline missed {st.missed}, "
+                  f"moved {st.moved}")
+            print(f"    latency   p50 {percentile(lat, 50) * ms:6.1f}  p99 {percentile(lat, 99) * ms:6.1f}  "
+                  f"max {st.latency_max * ms:6.1f} ms")
+            print(f"    wait      p50 {percentile(wait, 50) * ms:6.1f}  p99 {percentile(wait, 99) * ms:6.1f} ms")
+            print(f"    inference p50 {percentile(inf, 50) * ms:6.1f}  p99 {percentile(inf, 99) * ms:6.1f} ms")
+
+def build_sessions(specs, synthetic=False, dry_run=False):
+    """specs: list of dicts with 'camera_id' and optional 'name' (see config.SESSIONS)."""
+    from input_device import VirtualMouse, NullBackend
+    from synthetic import SyntheticHandSource, demo_script
+
+    sessions = []
+    for i, spec in enumerate(specs):
+        name = spec.get('name', f"Virtual Trackpad {i}")
+        mouse = VirtualMouse(backend=NullBackend()) if dry_run else VirtualMouse(name=name)
+        source = SyntheticHandSource(demo_script(), fps=config.FPS, noise=0.001, seed=i) if synthetic else None
+        sessions.append(Session(i, spec.get('camera_id', i), mouse, source=source))
+    return sessions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run several camera sessions on a shared inference pool")
+    parser.add_argument('--workers', type=int, default=config.INFERENCE_WORKERS)
+    parser.add_argument('--duration', type=float, default=None, help="Stop after this many seconds")
+    parser.add_argument('--synthetic', type=int, default=0, metavar='N',
+                        help="Use N synthetic sessions instead of config.SESSIONS cameras")
+    parser.add_argument('--mock-cost', type=float, default=0.02, help="Emulated inference CPU seconds per synthetic frame")
+    parser.add_argument('--dry-run', action='store_true', help="Discard output instead of creating uinput devices")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.synthetic:
+        sessions = build_sessions([{'camera_id': -1}] * args.synthetic, synthetic=True, dry_run=True)
+    else:
+        sessions = build_sessions(config.SESSIONS, dry_run=args.dry_run)
+
+    runner = MultiSessionRunner(sessions, workers=args.workers, mock_cost=args.mock_cost)
+    if not runner.run(duration=args.duration):
+        raise SystemExit(1)
+    runner.report()
@@ -0,0 +1,185 @@
+import gc
+import os
+import time
+import logging
+import threading
+from collections import deque
+
+from metrics import percentile, SAMPLE_WINDOW
+
+logger = logging.getLogger(__name__)
+
+# Low-jitter runtime support for the control loop.
+# All OS calls are best effort: anything not permitted or not available
+# is logged and skipped so the loop still runs on any platform.
+
+def pin_thread(cores):
+    """Pin the calling thread to the given CPU cores (Linux only)."""
+    if not cores or not hasattr(os, 'sched_setaffinity'):
+        return False
+    try:
+        # On Linux the pid argument accepts a thread id
+        os.sched_setaffinity(threading.get_native_id(), set(cores))
+        return True
+    except (OSError, ValueError) as ex:
+        logger.warning(f"Could not pin thread to cores {cores}: {ex}")
+        return False
+
+def raise_priority(priority):
+    """
+    Request SCHED_FIFO at `priority` for the calling thread, falling back to
+    a negative nice value. Returns the policy that was applied, or None.
+    """
+    tid = threading.get_native_id()
+    if hasattr(os, 'sched_setscheduler'):
+        try:
+            os.sched_setscheduler(tid, os.SCHED_FIFO, os.sched_param(priority))
+            return 'SCHED_FIFO'
+        except (OSError, ValueError) as ex:
+            logger.info(f"SCHED_FIFO not permitted ({ex}), trying nice")
+    if hasattr(os, 'setpriority'):
+        try:
+            os.setpriority(os.PRIO_PROCESS, tid, -10)
+            return 'nice -10'
+        except OSError as ex:
+            logger.warning(f"Could not raise priority: {ex}")
+    return None
+
+class JitterMonitor:
+    """
+    Tracks frame-to-frame intervals and GC pauses.
+    Cheap enough to run in every mode so normal and low-jitter runs can be compared.
+    Percentiles cover the last `window` samples; counts and maxima cover the whole run.
+    """
+    def __init__(self, frame_period, stall_factor=2.0, window=SAMPLE_WINDOW):
+        self.frame_period = frame_period
+        self.stall_threshold = frame_period * stall_factor
+        self.intervals = deque(maxlen=window)
+        self.last_frame = None
+        self.frames = 0
+        self.stalls = 0
+        self.worst = 0.0
+
+        self.gc_pauses = deque(maxlen=window) # (generation, seconds)
+        self.gc_count = 0
+        self.gc_max = 0.0
+        self._gc_start = None
+        gc.callbacks.append(self._on_gc)
+
+    def _on_gc(self, phase, info):
+        if phase == 'start':
+            self._gc_start = time.perf_counter()
+        elif self._gc_start is not None:
+            pause = time.perf_counter() - self._gc_start
+            self.gc_pauses.append((info.get('generation', -1), pause))
+            self.gc_count += 1
+            if pause > self.gc_max:
+                self.gc_max = pause
+            self._gc_start = None
+
+    def tick(self):
+        """Call once at the start of each frame."""
+        now = time.perf_counter()
+        if self.last_frame is not None:
+            interval = now - self.last_frame
+            self.intervals.append(interval)
+            self.frames += 1
+            if interval > self.stall_threshold:
+                self.stalls += 1
+            if interval > self.worst:
+                self.worst = interval
+        self.last_frame = now
+
+    def close(self):
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+
+    def summary(self):
+        n = len(self.intervals)
+        if n == 0:
+            return "Frame timing: no frames"
+        s = sorted(self.intervals)
+        mean = sum(s) / n
+        jitter = (sum((x - mean) ** 2 for x in s) / n) ** 0.5
+        p99 = percentile(s, 99)
+        ms = 1000.0
+        return (f"Frame timing: {self.frames} intervals (stats over last {n}), mean {mean * ms:.2f}ms, "
+                f"jitter (std) {jitter * ms:.2f}ms, p99 {p99 * ms:.2f}ms, worst {self.worst * ms:.2f}ms, "
+                f"stalls >{self.stall_threshold * ms:.0f}ms: {self.stalls} | "
+                f"GC: {self.gc_count} collections, max pause {self.gc_max * ms:.2f}ms")
+
+class RealtimeRuntime:
+    """
+    Optional low-jitter mode for the control loop.
+
+    cores: dict of role -> list of CPU ids, e.g. {'capture': [2], 'inference': [3], 'output': [2]}
+    priority: SCHED_FIFO priority to request (0 disables)
+    warmup_frames: frames to run before gc.freeze() and disabling automatic GC
+    frame_period: expected seconds per frame; GC only runs when this much slack remains
+    """
+    def __init__(self, enabled=False, cores=None, priority=0, warmup_frames=60, frame_period=1.0/30):
+        self.enabled = enabled
+        self.cores = cores or {}
+        self.priority = priority
+        self.warmup_frames = warmup_frames
+        self.frame_period = frame_period
+
+        self.frames = 0
+        self.frozen = False
+        self.frame_start_time = None
+        self.idle_collections = 0
+        self._gen2_counter = 0
+
+    def setup_thread(self, role):
+        """
+        Pin and prioritize the calling thread for a role:
+        'capture' (camera threads in multi_session), 'inference' (main's loop,
+        multi_session's dispatcher) or 'output' (scroll timers, session output).
+        """
+        if not self.enabled:
+            return
+        cores = self.cores.get(role)
+        if cores and pin_thread(cores):
+            logger.info(f"Pinned {role} thread to cores {cores}")
+        if self.priority:
+            policy = raise_priority(self.priority)
+            if policy:
+                logger.info(f"{role} thread running with {policy}")
+
+    def frame_start(self):
+        self.frame_start_time = time.perf_counter()
+
+    def frame_end(self):
+        """Call after a frame's output is sent. Runs GC in the idle slot before the next frame."""
+        if not self.enabled:
+            return
+        self.frames += 1
+
+        if not self.frozen:
+            if self.frames >= self.warmup_frames:
+                # Move everything allocated during start-up out of the collector's view
+                gc.collect()
+                gc.freeze()
+                gc.disable()
+                self.frozen = True
+                logger.info(f"GC frozen after {self.frames} warm-up frames ({gc.get_freeze_count()} objects)")
+            return
+
+        elapsed = time.perf_counter() - self.frame_start_time
+        slack = self.frame_period - elapsed
+        # Young generation is cheap; only touch older ones with plenty of slack
+        if slack > self.frame_period * 0.5:
+            self._gen2_counter += 1
+            gen = 2 if self._gen2_counter % 100 == 0 else (1 if self._gen2_counter % 10 == 0 else 0)
+            gc.collect(gen)
+            self.idle_collections += 1
+        elif gc.get_count()[0] > gc.get_threshold()[0] * 4:
+            # Never let garbage grow unbounded if the loop has no slack
+            gc.collect(0)
+            self.idle_collections += 1
+
+    def close(self):
+        if self.frozen:
+            gc.unfreeze()
+            gc.enable()
+            self.frozen = False
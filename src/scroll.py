@@ -0,0 +1,171 @@
+import math
+import time
+import logging
+import threading
+from enum import Enum, auto
+
+from input_device import WHEEL_NOTCH
+import config
+
+logger = logging.getLogger(__name__)
+
+# Kinetic scroll engine.
+# The controller feeds hand positions at the camera frame rate; a timer
+# thread turns the filtered vertical velocity into high-resolution wheel
+# events at SCROLL_RATE, so scrolling is smooth regardless of camera fps.
+# After the hand leaves scroll it coasts with exponential decay; stop()
+# (fist / CANCEL) halts it at once.
+
+class ScrollState(Enum):
+    IDLE = auto()
+    ACTIVE = auto()   # Hand is scrolling
+    COASTING = auto() # Hand released, velocity decaying
+
+class ScrollStats:
+    def __init__(self):
+        self.ticks = 0    # Timer ticks while scrolling or coasting
+        self.reports = 0  # Ticks that emitted a wheel report
+        self.units = 0    # Hi-res units emitted (signed sum)
+
+class ScrollEngine:
+    """
+    mouse: VirtualMouse (None = dry run)
+    rate: wheel reports per second while moving
+    sensitivity: wheel notches per 0.001 normalized units of hand travel
+    smoothing: velocity low-pass time constant (seconds)
+    decay: coasting velocity time constant (seconds)
+    deadband: hand speed (normalized units/s) treated as still
+    """
+    def __init__(self, mouse, rate=config.SCROLL_RATE, sensitivity=config.SCROLL_SENSITIVITY,
+                 smoothing=config.SCROLL_SMOOTHING, decay=config.SCROLL_DECAY,
+                 deadband=config.SCROLL_DEADBAND, clock=time.monotonic):
+        self.mouse = mouse
+        self.period = 1.0 / rate
+        self.gain = 1000 * sensitivity * WHEEL_NOTCH # Hand units -> hi-res units
+        self.smoothing = smoothing
+        self.decay = decay
+        self.deadband = deadband
+        self.clock = clock
+
+        self.threaded = True     # False: caller drives tick() (profiling)
+        self.thread_setup = None # Called on the timer thread before it starts ticking
+        self.stats = ScrollStats()
+
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.running = False
+        self.thread = None
+
+        self.state = ScrollState.IDLE
+        self.velocity = 0.0  # Filtered hand velocity, normalized units/s
+        self.last_y = None
+        self.last_t = None
+        self.last_tick = None
+        self.remainder = 0.0 # Sub-unit scroll carried between ticks
+
+    def hand(self, y, timestamp):
+        """Feed the scrolling hand's y (normalized) at frame time `timestamp`."""
+        with self.lock:
+            if self.state != ScrollState.ACTIVE:
+                # A new scroll catches any coasting motion
+                self.state = ScrollState.ACTIVE
+                self.velocity = 0.0
+                self.remainder = 0.0
+                self.last_y, self.last_t = y, timestamp
+                self.last_tick = None
+            else:
+                dt = timestamp - self.last_t
+                if dt > 0:
+                    v = (y - self.last_y) / dt
+                    alpha = 1.0 - math.exp(-dt / self.smoothing)
+                    self.velocity += alpha * (v - self.velocity)
+                    self.last_y, self.last_t = y, timestamp
+
+        if self.threaded:
+            self._ensure_thread()
+            self.wake.set()
+
+    def release(self):
+        """Hand left scroll: coast with decaying velocity."""
+        with self.lock:
+            if self.state == ScrollState.ACTIVE:
+                self.state = ScrollState.COASTING
+
+    def stop(self):
+        """Stop immediately. No wheel events are emitted after this returns."""
+        with self.lock:
+            self._halt()
+
+    def _halt(self):
+        self.state = ScrollState.IDLE
+        self.velocity = 0.0
+        self.remainder = 0.0
+        self.last_tick = None
+
+    def tick(self, now):
+        """Advance to `now` and emit one wheel report if a whole hi-res unit has built up."""
+        with self.lock:
+            if self.state == ScrollState.IDLE:
+                return 0
+            if self.last_tick is None:
+                self.last_tick = now
+                return 0
+            dt = now - self.last_tick
+            self.last_tick = now
+            self.stats.ticks += 1
+
+            v = self.velocity
+            if self.state == ScrollState.COASTING:
+                self.velocity = v = v * math.exp(-dt / self.decay)
+                if abs(v) < self.deadband:
+                    self._halt()
+                    return 0
+            elif abs(v) < self.deadband:
+                return 0 # Hand held still
+
+            self.remainder += v * dt * self.gain
+            units = int(self.remainder)
+            if units == 0:
+                return 0
+            self.remainder -= units
+            # Emit under the lock so stop() cannot race a report
+            if self.mouse:
+                self.mouse.scroll_hi_res(units)
+            self.stats.reports += 1
+            self.stats.units += units
+            return units
+
+    def _ensure_thread(self):
+        if self.thread is None:
+            self.running = True
+            self.thread = threading.Thread(target=self._run, name="scroll", daemon=True)
+            self.thread.start()
+
+    def _run(self):
+        if self.thread_setup:
+            self.thread_setup()
+        clock = self.clock
+        next_time = clock()
+        while self.running:
+            if self.state == ScrollState.IDLE:
+                # Sleep until the next scroll instead of ticking idle
+                self.wake.wait()
+                self.wake.clear()
+                next_time = clock()
+                continue
+
+            self.tick(clock())
+            next_time += self.period
+            delay = next_time - clock()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -self.period:
+                next_time = clock() # Fell behind; don't burst to catch up
+
+    def close(self):
+        self.stop()
+        self.running = False
+        self.wake.set()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
@@ -0,0 +1,170 @@
+import os
+import json
+import logging
+
+import numpy as np
+
+from fsm import LeftHandMode, RightHandAction
+
+logger = logging.getLogger(__name__)
+
+# Columnar on-disk session format.
+#
+# A session is a directory holding one raw little-endian file per column
+# (<column>.bin) plus meta.json with the dtypes and enum code tables.
+# Every column can be opened with np.memmap, so analytics can stream
+# through many GB of sessions without loading them into RAM.
+
+FORMAT_VERSION = 1
+
+COLUMNS = (
+    ('timestamp', '<f8'), # seconds
+    ('mode', 'u1'),       # LeftHandMode value
+    ('action', 'u1'),     # RightHandAction value
+    ('hands', 'u1'),      # HAND_LEFT | HAND_RIGHT presence bits
+    ('left_x', '<f4'),    # Left index tip, normalized (0 when absent)
+    ('left_y', '<f4'),
+    ('right_x', '<f4'),   # Right index tip, normalized (0 when absent)
+    ('right_y', '<f4'),
+)
+
+HAND_LEFT = 1
+HAND_RIGHT = 2
+
+class SessionWriter:
+    """
+    Appends frames to a session directory. Rows are buffered in
+    preallocated arrays and written out `chunk_rows` at a time.
+    """
+    def __init__(self, path, chunk_rows=4096):
+        self.path = path
+        self.chunk_rows = chunk_rows
+        os.makedirs(path, exist_ok=True)
+
+        meta = {
+            'version': FORMAT_VERSION,
+            'columns': dict(COLUMNS),
+            'modes': {m.name: m.value for m in LeftHandMode},
+            'actions': {a.name: a.value for a in RightHandAction},
+        }
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+        self.buffers = {name: np.zeros(chunk_rows, dtype=dtype) for name, dtype in COLUMNS}
+        self.files = {name: open(os.path.join(path, f"{name}.bin"), 'wb') for name, _ in COLUMNS}
+        self.n = 0 # Rows buffered
+        self.rows = 0 # Rows written in total
+
+    def append(self, timestamp, mode, action, left, right):
+        """
+        mode, action: LeftHandMode / RightHandAction (or their int values)
+        left, right: (x, y) index tip or None if the hand is absent
+        """
+        b = self.buffers
+        i = self.n
+        b['timestamp'][i] = timestamp
+        b['mode'][i] = getattr(mode, 'value', mode)
+        b['action'][i] = getattr(action, 'value', action)
+        hands = 0
+        if left is not None:
+            hands |= HAND_LEFT
+            b['left_x'][i], b['left_y'][i] = left
+        else:
+            b['left_x'][i] = b['left_y'][i] = 0.0
+        if right is not None:
+            hands |= HAND_RIGHT
+            b['right_x'][i], b['right_y'][i] = right
+        else:
+            b['right_x'][i] = b['right_y'][i] = 0.0
+        b['hands'][i] = hands
+
+        self.n += 1
+        if self.n == self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        if self.n:
+            for name, _ in COLUMNS:
+                self.buffers[name][:self.n].tofile(self.files[name])
+            self.rows += self.n
+            self.n = 0
+        for f in self.files.values():
+            f.flush()
+
+    def close(self):
+        self.flush()
+        for f in self.files.values():
+            f.close()
+
+class SessionReader:
+    """Memory-maps a session directory written by SessionWriter."""
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        if self.meta.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported session format version in {path}: {self.meta.get('version')}")
+
+        self.dtypes = {name: np.dtype(dt) for name, dt in self.meta['columns'].items()}
+        # A crash can leave columns of different lengths; only complete rows count
+        sizes = []
+        for name, dtype in self.dtypes.items():
+            file_path = os.path.join(path, f"{name}.bin")
+            size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+            sizes.append(size // dtype.itemsize)
+        self.count = min(sizes) if sizes else 0
+
+        self.mode_names = {v: k for k, v in self.meta['modes'].items()}
+        self.action_names = {v: k for k, v in self.meta['actions'].items()}
+        self._maps = {}
+
+    def column(self, name):
+        """Return a read-only np.memmap of a column (empty array if no rows)."""
+        if self.count == 0:
+            return np.zeros(0, dtype=self.dtypes[name])
+        m = self._maps.get(name)
+        if m is None:
+            m = np.memmap(os.path.join(self.path, f"{name}.bin"), dtype=self.dtypes[name],
+                          mode='r', shape=(self.count,))
+            self._maps[name] = m
+        return m
+
+    def chunks(self, columns, chunk_rows=1 << 20):
+        """Yield dicts of column slices, `chunk_rows` rows at a time."""
+        maps = {name: self.column(name) for name in columns}
+        for start in range(0, self.count, chunk_rows):
+            yield {name: m[start:start + chunk_rows] for name, m in maps.items()}
+
+def convert_csv(csv_path, session_path, chunk_rows=65536):
+    """
+    Convert a gesture_logs.txt CSV (Timestamp,Mode,Action,Left_X,Left_Y,Right_X,Right_Y)
+    into a session directory. A hand logged as (0, 0) is treated as absent.
+    Returns (rows written, lines skipped).
+    """
+    modes = {m.name: m.value for m in LeftHandMode}
+    actions = {a.name: a.value for a in RightHandAction}
+    writer = SessionWriter(session_path, chunk_rows=chunk_rows)
+    skipped = 0
+    try:
+        with open(csv_path) as f:
+            for line in f:
+                parts = line.rstrip('\n').split(',')
+                if len(parts) != 7 or parts[0] == 'Timestamp':
+                    skipped += parts[0] != 'Timestamp'
+                    continue
+                try:
+                    ts = float(parts[0])
+                    mode = modes[parts[1]]
+                    action = actions[parts[2]]
+                    lx, ly, rx, ry = float(parts[3]), float(parts[4]), float(parts[5]), float(parts[6])
+                except (ValueError, KeyError):
+                    skipped += 1
+                    continue
+                left = (lx, ly) if (lx, ly) != (0.0, 0.0) else None
+                right = (rx, ry) if (rx, ry) != (0.0, 0.0) else None
+                writer.append(ts, mode, action, left, right)
+    finally:
+        writer.close()
+    if skipped:
+        logger.warning(f"{csv_path}: skipped {skipped} malformed lines")
+    return writer.rows, skipped
@@ -0,0 +1,451 @@
+import math
+import json
+import random
+import logging
+from enum import Enum, auto
+
+logger = logging.getLogger(__name__)
+
+# Synthetic hand generator used by VisionEngine in mock mode.
+# Produces MediaPipe-shaped landmark lists (21 points, normalized coords)
+# so the FSM, filter and output path can be driven without a camera or model.
+
+class HandPose(Enum):
+    FIST = auto()          # 0 fingers -> NEUTRAL (left) / CANCEL or TAP (right)
+    OPEN_PALM = auto()     # 5 fingers -> ARMED (left) / PUSH (right, navigation)
+    THUMB_UP = auto()      # Thumb only -> CLICK_MODE (left)
+    POINT = auto()         # Index only -> CURSOR (right, armed)
+    TWO_FINGERS = auto()   # Index+Middle -> SCROLL_MODE (left) / swipe (right)
+    THREE_FINGERS = auto() # Index+Middle+Ring -> NAVIGATION_MODE (left)
+    PINCH = auto()         # Index tip on thumb tip -> DRAG_MODE (left) / TAP, DRAG (right)
+
+# Hand geometry in hand-local normalized coordinates.
+# Wrist at origin, fingers pointing up the image (-y), thumb on the -x side.
+# Sizes roughly match a hand at arm's length in a 640x480 frame.
+_WRIST = (0.0, 0.0, 0.0)
+
+_MCP = {
+    'Index': (-0.030, -0.090),
+    'Middle': (-0.010, -0.095),
+    'Ring': (0.010, -0.090),
+    'Pinky': (0.030, -0.080),
+}
+
+_FINGER_IDS = {
+    'Index': (5, 6, 7, 8),
+    'Middle': (9, 10, 11, 12),
+    'Ring': (13, 14, 15, 16),
+    'Pinky': (17, 18, 19, 20),
+}
+
+# PIP, DIP, TIP offsets from the MCP joint (x, y, z)
+_EXTENDED = ((0.0, -0.040, 0.0), (0.0, -0.065, 0.0), (0.0, -0.085, 0.0))
+_CURLED = ((0.0, -0.030, -0.010), (0.0, -0.010, -0.025), (0.0, 0.010, -0.020))
+
+# Thumb CMC, MCP, IP, TIP
+_THUMB_EXTENDED = ((-0.025, -0.020, 0.0), (-0.050, -0.035, 0.0), (-0.080, -0.050, 0.0), (-0.110, -0.060, 0.0))
+_THUMB_FOLDED = ((-0.025, -0.020, 0.0), (-0.040, -0.040, -0.010), (-0.030, -0.060, -0.020), (-0.005, -0.065, -0.020))
+
+# Index joints bent over to meet the extended thumb tip (OK sign / pinch)
+_INDEX_PINCH = ((-0.030, -0.090, 0.0), (-0.060, -0.110, -0.010), (-0.090, -0.095, -0.015), (-0.100, -0.062, -0.010))
+
+_POSE_FINGERS = {
+    HandPose.FIST: (),
+    HandPose.OPEN_PALM: ('Thumb', 'Index', 'Middle', 'Ring', 'Pinky'),
+    HandPose.THUMB_UP: ('Thumb',),
+    HandPose.POINT: ('Index',),
+    HandPose.TWO_FINGERS: ('Index', 'Middle'),
+    HandPose.THREE_FINGERS: ('Index', 'Middle', 'Ring'),
+    HandPose.PINCH: ('Thumb', 'Middle', 'Ring', 'Pinky'),
+}
+
+# Landmark 9 (middle MCP) is the anchor a trajectory moves; the FSM uses it for swipes.
+_ANCHOR_ID = 9
+
+
+def _build_pose(pose):
+    """Return 21 (x, y, z) tuples in hand-local coordinates for a pose."""
+    points = [None] * 21
+    points[0] = _WRIST
+
+    up = _POSE_FINGERS[pose]
+    thumb = _THUMB_EXTENDED if 'Thumb' in up else _THUMB_FOLDED
+    for i, p in enumerate(thumb):
+        points[1 + i] = p
+
+    for name, ids in _FINGER_IDS.items():
+        if name == 'Index' and pose == HandPose.PINCH:
+            for idx, p in zip(ids, _INDEX_PINCH):
+                points[idx] = p
+            continue
+
+        mx, my = _MCP[name]
+        points[ids[0]] = (mx, my, 0.0)
+        joints = _EXTENDED if name in up else _CURLED
+        for idx, (ox, oy, oz) in zip(ids[1:], joints):
+            points[idx] = (mx + ox, my + oy, oz)
+
+    return points
+
+_POSES = {pose: _build_pose(pose) for pose in HandPose}
+
+
+class Landmark:
+    """Single landmark, mirrors mediapipe NormalizedLandmark (x, y, z)."""
+    __slots__ = ('x', 'y', 'z')
+
+    def __init__(self, x, y, z):
+        self.x = x
+        self.y = y
+        self.z = z
+
+class LandmarkList:
+    """Mirrors mediapipe NormalizedLandmarkList so get_landmarks_dict can consume it."""
+    __slots__ = ('landmark',)
+
+    def __init__(self, landmark):
+        self.landmark = landmark
+
+
+# --- Trajectories ---
+# Each trajectory maps segment-local time (seconds) to the anchor position (x, y).
+
+class Hold:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+    def position(self, t):
+        return self.x, self.y
+
+class Line:
+    """Constant velocity move from start to end over duration, then hold. Use for swipes."""
+    def __init__(self, start, end, duration):
+        self.start = start
+        self.end = end
+        self.duration = duration
+
+    def position(self, t):
+        k = min(1.0, max(0.0, t / self.duration)) if self.duration > 0 else 1.0
+        return (self.start[0] + (self.end[0] - self.start[0]) * k,
+                self.start[1] + (self.end[1] - self.start[1]) * k)
+
+class Circle:
+    """Circular cursor motion."""
+    def __init__(self, center, radius, period):
+        self.center = center
+        self.radius = radius
+        self.period = period
+
+    def position(self, t):
+        a = 2 * math.pi * t / self.period
+        return (self.center[0] + self.radius * math.cos(a),
+                self.center[1] + self.radius * math.sin(a))
+
+class Sweep:
+    """Sinusoidal back-and-forth motion along one axis. Use for scrolling."""
+    def __init__(self, center, amplitude, period, axis='y'):
+        self.center = center
+        self.amplitude = amplitude
+        self.period = period
+        self.axis = axis
+
+    def position(self, t):
+        d = self.amplitude * math.sin(2 * math.pi * t / self.period)
+        if self.axis == 'x':
+            return self.center[0] + d, self.center[1]
+        return self.center[0], self.center[1] + d
+
+
+class Segment:
+    """
+    One step of a script: hold poses for `duration` seconds.
+    A pose of None means that hand is not in view.
+    """
+    def __init__(self, duration, left=None, right=None, left_path=None, right_path=None):
+        self.duration = duration
+        self.left = left
+        self.right = right
+        self.left_path = left_path or Hold(0.25, 0.55)
+        self.right_path = right_path or Hold(0.70, 0.55)
+
+
+class SyntheticHandSource:
+    """
+    Scriptable synthetic hand generator.
+
+    script: list of Segment
+    fps: synthetic frame rate; timestamps advance by 1/fps per frame regardless of wall time
+    noise: std dev of per-landmark gaussian jitter (normalized units)
+    dropout: probability per hand per frame that a dropout burst starts
+    dropout_frames: length of each dropout burst in frames
+    """
+    def __init__(self, script, fps=30.0, noise=0.0, dropout=0.0, dropout_frames=1,
+                 seed=None, loop=True, start_time=0.0):
+        if not script:
+            raise ValueError("Synthetic script must contain at least one segment")
+
+        self.script = script
+        self.fps = fps
+        self.noise = noise
+        self.dropout = dropout
+        self.dropout_frames = dropout_frames
+        self.loop = loop
+        self.start_time = start_time
+        self.rng = random.Random(seed)
+
+        self.duration = sum(s.duration for s in script)
+        self.frame_index = -1
+        self.timestamp = start_time
+        self.segment = script[0]
+        self._dropped = {'Left': 0, 'Right': 0}
+
+    @property
+    def finished(self):
+        return not self.loop and (self.frame_index + 1) / self.fps >= self.duration
+
+    def _segment_at(self, t):
+        if self.loop:
+            t = t % self.duration
+        for seg in self.script:
+            if t < seg.duration:
+                return seg, t
+            t -= seg.duration
+        last = self.script[-1]
+        return last, last.duration
+
+    def _make_hand(self, pose, x, y, mirror):
+        ax, ay, _ = _POSES[pose][_ANCHOR_ID]
+        sign = -1.0 if mirror else 1.0
+        noise = self.noise
+        gauss = self.rng.gauss
+        points = []
+        for px, py, pz in _POSES[pose]:
+            lx = x + sign * (px - ax)
+            ly = y + (py - ay)
+            if noise:
+                lx += gauss(0.0, noise)
+                ly += gauss(0.0, noise)
+            points.append(Landmark(lx, ly, pz))
+        return LandmarkList(points)
+
+    def _visible(self, label):
+        if self._dropped[label] > 0:
+            self._dropped[label] -= 1
+            return False
+        if self.dropout and self.rng.random() < self.dropout:
+            self._dropped[label] = self.dropout_frames - 1
+            return False
+        return True
+
+    def next_frame(self):
+        """Advance one frame. Returns {'Left': LandmarkList, 'Right': LandmarkList} like VisionEngine.process."""
+        self.frame_index += 1
+        t = self.frame_index / self.fps
+        self.timestamp = self.start_time + t
+
+        seg, local_t = self._segment_at(t)
+        self.segment = seg
+
+        hands = {}
+        # Frame is mirrored in main, so the user's left hand appears with its thumb on the right.
+        if seg.left is not None and self._visible('Left'):
+            x, y = seg.left_path.position(local_t)
+            hands['Left'] = self._make_hand(seg.left, x, y, mirror=True)
+        if seg.right is not None and self._visible('Right'):
+            x, y = seg.right_path.position(local_t)
+            hands['Right'] = self._make_hand(seg.right, x, y, mirror=False)
+        return hands
+
+    def frames(self, count=None):
+        """Yield (timestamp, hands) for `count` frames, or until a non-looping script ends."""
+        n = 0
+        while count is None or n < count:
+            if self.finished:
+                return
+            hands = self.next_frame()
+            yield self.timestamp, hands
+            n += 1
+
+
+class ReplayHandSource:
+    """
+    Replays landmarks saved with save_frames (JSON lines:
+    {"t": timestamp, "Left": [[x, y, z] * 21], "Right": [...]}).
+    Same interface as SyntheticHandSource.
+    """
+    def __init__(self, path, loop=False):
+        self.loop = loop
+        self.frames_data = []
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    self.frames_data.append(json.loads(line))
+        if not self.frames_data:
+            raise ValueError(f"No frames in replay file: {path}")
+
+        self.frame_index = -1
+        self.timestamp = self.frames_data[0]['t']
+        # Offset added to timestamps on each loop so time stays monotonic
+        self._loop_offset = 0.0
+        self._span = self.frames_data[-1]['t'] - self.frames_data[0]['t']
+        if len(self.frames_data) > 1:
+            self._span += self._span / (len(self.frames_data) - 1)
+
+    @property
+    def finished(self):
+        return not self.loop and self.frame_index + 1 >= len(self.frames_data)
+
+    def next_frame(self):
+        self.frame_index += 1
+        i = self.frame_index % len(self.frames_data)
+        if i == 0 and self.frame_index > 0:
+            self._loop_offset += self._span
+        data = self.frames_data[i]
+        self.timestamp = data['t'] + self._loop_offset
+
+        hands = {}
+        for label in ('Left', 'Right'):
+            points = data.get(label)
+            if points:
+                hands[label] = LandmarkList([Landmark(x, y, z) for x, y, z in points])
+        return hands
+
+    def frames(self, count=None):
+        n = 0
+        while count is None or n < count:
+            if self.finished:
+                return
+            hands = self.next_frame()
+            yield self.timestamp, hands
+            n += 1
+
+
+def save_frames(source, path, count=None):
+    """Write frames from any hand source to a JSON lines file for ReplayHandSource."""
+    n = 0
+    with open(path, 'w') as f:
+        for timestamp, hands in source.frames(count):
+            data = {'t': timestamp}
+            for label, lm in hands.items():
+                data[label] = [[p.x, p.y, p.z] for p in lm.landmark]
+            f.write(json.dumps(data) + "\n")
+            n += 1
+    return n
+
+
+# --- Canned scripts ---
+# Each covers one gesture family; the left hand is held for longer than DEBOUNCE_FRAMES.
+# Paths are continuous across segments so pose changes never look like swipes.
+
+def cursor_script():
+    return [
+        Segment(0.5, left=HandPose.FIST, right=HandPose.FIST, right_path=Hold(0.75, 0.5)),
+        Segment(4.0, left=HandPose.OPEN_PALM, right=HandPose.POINT,
+                right_path=Circle((0.65, 0.5), 0.1, 2.0)),
+    ]
+
+def click_script():
+    return [
+        Segment(0.5, left=HandPose.THUMB_UP, right=HandPose.POINT),
+        Segment(0.2, left=HandPose.THUMB_UP, right=HandPose.PINCH),
+        Segment(0.3, left=HandPose.THUMB_UP, right=HandPose.POINT),
+    ]
+
+def drag_script():
+    return [
+        Segment(0.5, left=HandPose.PINCH, right=HandPose.POINT, right_path=Hold(0.6, 0.5)),
+        Segment(1.5, left=HandPose.PINCH, right=HandPose.PINCH,
+                right_path=Line((0.6, 0.5), (0.75, 0.4), 1.5)),
+        Segment(0.5, left=HandPose.PINCH, right=HandPose.POINT, right_path=Hold(0.75, 0.4)),
+    ]
+
+def scroll_script():
+    return [
+        Segment(0.5, left=HandPose.TWO_FINGERS, right=HandPose.POINT, right_path=Hold(0.7, 0.5)),
+        Segment(3.0, left=HandPose.TWO_FINGERS, right=HandPose.POINT,
+                right_path=Sweep((0.7, 0.5), 0.12, 1.5)),
+        Segment(0.5, left=HandPose.TWO_FINGERS, right=HandPose.FIST, right_path=Hold(0.7, 0.5)),
+    ]
+
+def swipe_script():
+    return [
+        Segment(0.5, left=HandPose.THREE_FINGERS, right=HandPose.TWO_FINGERS,
+                right_path=Hold(0.55, 0.55)),
+        Segment(0.3, left=HandPose.THREE_FINGERS, right=HandPose.TWO_FINGERS,
+                right_path=Line((0.55, 0.55), (0.85, 0.55), 0.25)),
+        Segment(0.7, left=HandPose.THREE_FINGERS, right=HandPose.TWO_FINGERS,
+                right_path=Hold(0.85, 0.55)),
+        Segment(0.3, left=HandPose.THREE_FINGERS, right=HandPose.TWO_FINGERS,
+                right_path=Line((0.85, 0.55), (0.55, 0.55), 0.25)),
+        Segment(0.7, left=HandPose.THREE_FINGERS, right=HandPose.TWO_FINGERS,
+                right_path=Hold(0.55, 0.55)),
+        Segment(0.5, left=HandPose.THREE_FINGERS, right=HandPose.OPEN_PALM,
+                right_path=Hold(0.55, 0.55)),
+    ]
+
+def demo_script():
+    # Hands drop out of view between scripts, so position jumps at the joins are not swipes
+    script = []
+    for part in (cursor_script, click_script, drag_script, scroll_script, swipe_script):
+        if script:
+            script.append(Segment(0.2))
+        script += part()
+    return script
+
+SCRIPTS = {
+    'cursor': cursor_script,
+    'click': click_script,
+    'drag': drag_script,
+    'scroll': scroll_script,
+    'swipe': swipe_script,
+    'demo': demo_script,
+}
+
+
+if __name__ == "__main__":
+    # Load test: drive vision (mock) -> FSM -> filter as fast as possible.
+    import argparse
+    import time
+    from collections import Counter
+
+    from vision import VisionEngine
+    from filter import SignalFilter
+    from fsm import GestureFSM, RightHandAction
+    import config
+
+    parser = argparse.ArgumentParser(description="Synthetic hand load test")
+    parser.add_argument('--script', choices=sorted(SCRIPTS), default='demo')
+    parser.add_argument('--fps', type=float, default=config.FPS)
+    parser.add_argument('--frames', type=int, default=10000)
+    parser.add_argument('--noise', type=float, default=0.001)
+    parser.add_argument('--dropout', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    source = SyntheticHandSource(SCRIPTS[args.script](), fps=args.fps, noise=args.noise,
+                                 dropout=args.dropout, seed=args.seed)
+    vision = VisionEngine(mock_source=source)
+    f_filter = SignalFilter.from_config()
+    fsm = GestureFSM(debounce_frames=config.DEBOUNCE_FRAMES)
+
+    modes = Counter()
+    actions = Counter()
+    start = time.perf_counter()
+    for _ in range(args.frames):
+        hands = vision.process(None)
+        left = vision.get_landmarks_dict(hands.get('Left'), config.WIDTH, config.HEIGHT)
+        right = vision.get_landmarks_dict(hands.get('Right'), config.WIDTH, config.HEIGHT)
+        mode, action = fsm.update(left, right, timestamp=source.timestamp)
+        modes[mode.name] += 1
+        actions[action.name] += 1
+        if action in (RightHandAction.CURSOR, RightHandAction.DRAG) and right:
+            f_filter.process(right[8]['x'], right[8]['y'], 1.0 / args.fps)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.frames} frames in {elapsed:.3f}s ({args.frames / elapsed:.0f} frames/s)")
+    print(f"Modes:   {dict(modes)}")
+    print(f"Actions: {dict(actions)}")
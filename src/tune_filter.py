@@ -0,0 +1,234 @@
+import os
+import json
+import math
+import time
+import random
+import logging
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from filter import SignalFilter
+import config
+
+logger = logging.getLogger(__name__)
+
+# SignalFilter parameter auto-tuner.
+#
+# Replays recorded cursor trajectories (right index tip while CURSOR/DRAG)
+# through SignalFilter for many parameter sets on a process pool, and
+# scores each set on jitter at rest against lag during motion:
+#   jitter: RMS frame-to-frame cursor movement while the hand is still
+#   lag:    RMS distance from a centered moving average while the hand moves
+# Both are in cursor pixels (normalized * 1000 * SENSITIVITY), like main.
+
+PARAMS = ('min_cutoff', 'beta', 'd_cutoff', 'process_noise', 'measurement_noise')
+
+GRID = {
+    'min_cutoff': (0.1, 0.25, 0.5, 1.0, 2.0),
+    'beta': (0.5, 1.0, 2.0, 4.0, 8.0, 16.0),
+    'd_cutoff': (0.5, 1.0, 2.0),
+    'process_noise': (1e-5, 1e-4, 1e-3),
+    'measurement_noise': (1e-3, 1e-2, 1e-1),
+}
+
+REST_SPEED = 0.05      # Normalized units/s below which the hand counts as still
+REFERENCE_WINDOW = 5   # Frames in the centered moving average used as ground truth
+MIN_SEGMENT = 10       # Shortest trajectory segment worth scoring (frames)
+
+# --- Trajectories ---
+
+def _split_segments(t, x, y, keep, max_gap):
+    """Split rows where `keep` is True into contiguous segments without time gaps."""
+    segments = []
+    idx = np.flatnonzero(keep)
+    if len(idx) == 0:
+        return segments
+    breaks = np.flatnonzero((np.diff(idx) != 1) | (np.diff(t[idx]) > max_gap)) + 1
+    for part in np.split(idx, breaks):
+        if len(part) >= MIN_SEGMENT:
+            segments.append((t[part].astype(np.float64), x[part].astype(np.float64), y[part].astype(np.float64)))
+    return segments
+
+def load_sessions(paths, max_gap=0.25):
+    """Cursor trajectories from columnar sessions (see session_store.py)."""
+    from session_store import SessionReader, HAND_RIGHT
+    segments = []
+    for path in paths:
+        r = SessionReader(path)
+        codes = {v for k, v in r.meta['actions'].items() if k in ('CURSOR', 'DRAG')}
+        action = np.asarray(r.column('action'))
+        keep = np.isin(action, list(codes)) & ((np.asarray(r.column('hands')) & HAND_RIGHT) != 0)
+        segments += _split_segments(np.asarray(r.column('timestamp')), np.asarray(r.column('right_x')),
+                                    np.asarray(r.column('right_y')), keep, max_gap)
+    return segments
+
+def synthetic_segments(seconds, noise=0.002, seed=0):
+    """Cursor trajectories from the synthetic hand generator (for trying the tuner without recordings)."""
+    from synthetic import SyntheticHandSource, Segment, HandPose, Circle, Line, Hold
+    script = [
+        Segment(2.0, right=HandPose.POINT, right_path=Hold(0.6, 0.5)),
+        Segment(3.0, right=HandPose.POINT, right_path=Circle((0.6, 0.5), 0.1, 3.0)),
+        Segment(1.0, right=HandPose.POINT, right_path=Line((0.7, 0.5), (0.5, 0.4), 0.4)),
+        Segment(2.0, right=HandPose.POINT, right_path=Hold(0.5, 0.4)),
+    ]
+    source = SyntheticHandSource(script, fps=config.FPS, noise=noise, seed=seed)
+    n = int(seconds * config.FPS)
+    t = np.empty(n)
+    x = np.empty(n)
+    y = np.empty(n)
+    for i, (ts, hands) in enumerate(source.frames(n)):
+        tip = hands['Right'].landmark[8]
+        t[i], x[i], y[i] = ts, tip.x, tip.y
+    return _split_segments(t, x, y, np.ones(n, dtype=bool), max_gap=1.0)
+
+# --- Scoring ---
+
+def _reference(v):
+    """Centered moving average, used as the 'true' hand position."""
+    k = REFERENCE_WINDOW
+    padded = np.pad(v, k // 2, mode='edge')
+    return np.convolve(padded, np.ones(k) / k, mode='valid')
+
+def prepare(segments):
+    """Precompute per-segment references and rest/motion masks (once per worker)."""
+    prepared = []
+    for t, x, y in segments:
+        rx, ry = _reference(x), _reference(y)
+        dt = np.diff(t)
+        dt[dt <= 0] = 1.0 / config.FPS
+        speed = np.hypot(np.diff(rx), np.diff(ry)) / dt
+        rest = np.concatenate(([True], speed < REST_SPEED))
+        prepared.append((t.tolist(), x.tolist(), y.tolist(), rx, ry, rest))
+    return prepared
+
+def evaluate(params, prepared, lag_weight):
+    """Returns (score, jitter_px, lag_px) for one parameter set."""
+    sx_scale = 1000 * config.SENSITIVITY_X
+    sy_scale = 1000 * config.SENSITIVITY_Y
+    jitter_sq = jitter_n = lag_sq = lag_n = 0.0
+
+    for t, x, y, rx, ry, rest in prepared:
+        f = SignalFilter(**params)
+        f.reset(x[0], y[0])
+        n = len(t)
+        fx = np.empty(n)
+        fy = np.empty(n)
+        fx[0], fy[0] = x[0], y[0]
+        prev_t = t[0]
+        for i in range(1, n):
+            dt = t[i] - prev_t
+            prev_t = t[i]
+            fx[i], fy[i] = f.process(x[i], y[i], dt if dt > 0 else 1.0 / config.FPS)
+
+        # Jitter: cursor movement between consecutive rest frames
+        still = rest[1:] & rest[:-1]
+        mx = np.diff(fx)[still] * sx_scale
+        my = np.diff(fy)[still] * sy_scale
+        jitter_sq += float(np.sum(mx * mx + my * my))
+        jitter_n += int(still.sum())
+
+        # Lag: distance from the reference while moving
+        moving = ~rest
+        ex = (fx - rx)[moving] * sx_scale
+        ey = (fy - ry)[moving] * sy_scale
+        lag_sq += float(np.sum(ex * ex + ey * ey))
+        lag_n += int(moving.sum())
+
+    jitter = math.sqrt(jitter_sq / jitter_n) if jitter_n else 0.0
+    lag = math.sqrt(lag_sq / lag_n) if lag_n else 0.0
+    return jitter + lag_weight * lag, jitter, lag
+
+# --- Process pool ---
+
+_worker = {}
+
+def _init_worker(segments, lag_weight):
+    _worker['prepared'] = prepare(segments)
+    _worker['lag_weight'] = lag_weight
+
+def _evaluate_task(params):
+    return params, evaluate(params, _worker['prepared'], _worker['lag_weight'])
+
+def _perturb(params, rng, scale):
+    """Log-normal step around a parameter set."""
+    return {k: v * math.exp(rng.gauss(0.0, scale)) for k, v in params.items()}
+
+def tune(segments, workers=None, lag_weight=0.25, refine_rounds=3, refine_samples=64, top=8, seed=0):
+    """Grid search, then rounds of random refinement around the best sets. Returns sorted results."""
+    grid = [dict(zip(PARAMS, values)) for values in itertools.product(*(GRID[p] for p in PARAMS))]
+    rng = random.Random(seed)
+    workers = workers or os.cpu_count() or 1
+    results = []
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(segments, lag_weight)) as pool:
+        chunksize = max(1, len(grid) // (workers * 4))
+        results += pool.map(_evaluate_task, grid, chunksize=chunksize)
+        results.sort(key=lambda r: r[1][0])
+        logger.info(f"Grid: {len(grid)} sets, best score {results[0][1][0]:.3f}")
+
+        scale = 0.5
+        for round_ in range(refine_rounds):
+            best = [p for p, _ in results[:top]]
+            candidates = [_perturb(best[i % len(best)], rng, scale) for i in range(refine_samples)]
+            results += pool.map(_evaluate_task, candidates, chunksize=max(1, refine_samples // (workers * 4)))
+            results.sort(key=lambda r: r[1][0])
+            logger.info(f"Refine {round_ + 1}: best score {results[0][1][0]:.3f}")
+            scale *= 0.5
+
+    return results
+
+def current_params():
+    return {
+        'min_cutoff': config.FILTER_MIN_CUTOFF,
+        'beta': config.FILTER_BETA,
+        'd_cutoff': config.FILTER_D_CUTOFF,
+        'process_noise': config.FILTER_PROCESS_NOISE,
+        'measurement_noise': config.FILTER_MEASUREMENT_NOISE,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Auto-tune SignalFilter parameters on recorded trajectories")
+    parser.add_argument('sessions', nargs='*', help="Columnar session directories (see analytics.py convert)")
+    parser.add_argument('--synthetic', type=float, default=0.0, metavar='SECONDS',
+                        help="Tune on synthetic trajectories instead of recordings")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--lag-weight', type=float, default=0.25, help="Pixels of lag worth one pixel of jitter")
+    parser.add_argument('--refine', type=int, default=3, help="Random refinement rounds after the grid")
+    parser.add_argument('--out', default="filter_tuning.json")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.sessions:
+        segments = load_sessions(args.sessions)
+    elif args.synthetic:
+        segments = synthetic_segments(args.synthetic)
+    else:
+        parser.error("Give session directories or --synthetic SECONDS")
+    if not segments:
+        parser.error("No cursor trajectories found")
+    logger.info(f"{len(segments)} segments, {sum(len(s[0]) for s in segments)} frames")
+
+    base_score, base_jitter, base_lag = evaluate(current_params(), prepare(segments), args.lag_weight)
+
+    start = time.perf_counter()
+    results = tune(segments, workers=args.workers, lag_weight=args.lag_weight, refine_rounds=args.refine)
+    elapsed = time.perf_counter() - start
+
+    best, (score, jitter, lag) = results[0]
+    print(f"Evaluated {len(results)} parameter sets in {elapsed:.1f}s")
+    print(f"Current config: score {base_score:.3f} (jitter {base_jitter:.3f}px, lag {base_lag:.3f}px)")
+    print(f"Best:           score {score:.3f} (jitter {jitter:.3f}px, lag {lag:.3f}px)")
+    print("\n# config.py")
+    for name in PARAMS:
+        print(f"FILTER_{name.upper()} = {best[name]:.4g}")
+
+    with open(args.out, 'w') as f:
+        json.dump({'params': best, 'score': score, 'jitter_px': jitter, 'lag_px': lag,
+                   'lag_weight': args.lag_weight, 'baseline': current_params(),
+                   'baseline_score': base_score}, f, indent=2)
+    print(f"\nWrote {args.out}")
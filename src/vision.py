@@ -15,10 +15,15 @@ except ImportError:
     logger.warning("MediaPipe not found or broken. Using Mock Vision Engine.")
 
 class VisionEngine:
-    def __init__(self, max_num_hands=1, min_detection_confidence=0.7, min_tracking_confidence=0.5):
-        self.mock_mode = not HAS_MEDIAPIPE
+    def __init__(self, max_num_hands=1, min_detection_confidence=0.7, min_tracking_confidence=0.5, mock_source=None):
+        # mock_source: optional synthetic.SyntheticHandSource. Forces mock mode when given.
+        self.mock_mode = not HAS_MEDIAPIPE or mock_source is not None
+        self.mock_source = mock_source
         if self.mock_mode:
-            logger.warning("Initializing VisionEngine in MOCK MODE.")
+            if mock_source is not None:
+                logger.info("Initializing VisionEngine in MOCK MODE with synthetic hands.")
+            else:
+                logger.warning("Initializing VisionEngine in MOCK MODE.")
             return
 
         self.mp_hands = mp.solutions.hands
@@ -35,7 +40,9 @@ class VisionEngine:
         Process a BGR frame and return a dictionary of landmarks {'Left': lm, 'Right': lm}.
         """
         if self.mock_mode:
-            # Return dummy landmarks for testing if needed, or None
+            # Synthetic landmarks if a source is scripted, otherwise nothing
+            if self.mock_source is not None:
+                return self.mock_source.next_frame()
             return {}
 
         # Convert to RGB for MediaPipe
@@ -55,18 +62,18 @@ class VisionEngine:
                 
         return hands
 
-    def get_landmarks_dict(self, landmarks, width, height):
+    def get_landmarks_dict(self, landmarks, width, height, out=None):
         """
         Convert normalized landmarks to pixel coordinates dictionary.
         Also returns normalized coordinates for logic.
+        out: optional dict from a previous call to refill in place, so the
+             per-frame hot path does not allocate 21 new dicts per hand.
+             The result is only valid until the next call with the same buffer.
         """
-        if self.mock_mode:
-             return None
-
         if not landmarks:
             return None
             
-        coords = {}
+        coords = out if out is not None else {}
         # Key points mapping
         # 0: Wrist
         # 4: Thumb Tip
@@ -76,17 +83,17 @@ class VisionEngine:
         # 20: Pinky Tip
         
         for id, lm in enumerate(landmarks.landmark):
-            cx, cy = int(lm.x * width), int(lm.y * height)
-            coords[id] = {
-                'x': lm.x, 
-                'y': lm.y, 
-                'z': lm.z, 
-                'px': cx, 
-                'py': cy
-            }
+            point = coords.get(id)
+            if point is None:
+                point = coords[id] = {}
+            point['x'] = lm.x
+            point['y'] = lm.y
+            point['z'] = lm.z
+            point['px'] = int(lm.x * width)
+            point['py'] = int(lm.y * height)
             
         return coords
 
     def is_finger_up(self, coords, finger_tip_id, finger_dip_id):
-        if self.mock_mode: return False
+        if self.mock_mode and self.mock_source is None: return False
         return coords[finger_tip_id]['y'] < coords[finger_dip_id]['y']
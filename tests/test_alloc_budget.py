@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+# The pipeline pulls in numpy (filter) and cv2 (vision)
+pytest.importorskip("numpy", reason="numpy is required by the filter")
+pytest.importorskip("cv2", reason="OpenCV is required by the vision engine")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from alloc_profile import FrameAllocProfiler, ALLOC_BUDGET_BYTES, RETAINED_LIMIT_BYTES
+
+
+@pytest.mark.parametrize("script", ["cursor", "scroll"])
+def test_hot_path_allocation_budget(script):
+    result = FrameAllocProfiler(script).run(1000)
+
+    assert result['transient_p99'] <= ALLOC_BUDGET_BYTES, (
+        f"{script}: p99 transient {result['transient_p99']} B/frame exceeds {ALLOC_BUDGET_BYTES} B")
+    assert result['retained_per_frame'] < RETAINED_LIMIT_BYTES, (
+        f"{script}: {result['retained_per_frame']:.1f} B/frame retained, limit {RETAINED_LIMIT_BYTES} B")
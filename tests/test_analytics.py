@@ -0,0 +1,107 @@
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("numpy", reason="numpy is required by the session store")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from fsm import LeftHandMode, RightHandAction
+from session_store import SessionReader, convert_csv, HAND_LEFT, HAND_RIGHT
+from analytics import SessionAnalytics
+
+MODE_NAMES = [m.name for m in LeftHandMode]
+ACTION_NAMES = [a.name for a in RightHandAction]
+
+# gesture_logs.txt rows; a hand logged as (0, 0) is absent
+CSV = """Timestamp,Mode,Action,Left_X,Left_Y,Right_X,Right_Y
+0.000000,NEUTRAL,IDLE,0.000,0.000,0.000,0.000
+0.100000,ARMED,IDLE,0.500,0.500,0.000,0.000
+0.200000,ARMED,CURSOR,0.500,0.500,0.400,0.400
+0.300000,ARMED,CURSOR,0.500,0.500,0.410,0.400
+0.400000,CLICK_MODE,TAP,0.500,0.500,0.410,0.400
+not,a,row
+0.500000,ARMED,CURSOR,0.000,0.000,0.420,0.400
+0.600000,ARMED,CURSOR,0.500,0.500,0.430,0.400
+0.700000,NEUTRAL,IDLE,0.000,0.000,0.000,0.000
+"""
+
+
+@pytest.fixture
+def session(tmp_path):
+    csv_path = tmp_path / "gesture_logs.txt"
+    csv_path.write_text(CSV)
+    session_path = str(tmp_path / "log.session")
+    # A small write chunk also splits the rows across several flushes
+    assert convert_csv(str(csv_path), session_path, chunk_rows=3) == (8, 1)
+    return session_path
+
+
+def test_convert_csv_treats_zero_coordinates_as_absent(session):
+    reader = SessionReader(session)
+    assert reader.count == 8
+
+    hands = list(reader.column('hands'))
+    both = HAND_LEFT | HAND_RIGHT
+    assert hands == [0, HAND_LEFT, both, both, both, HAND_RIGHT, both, 0]
+    assert list(reader.column('left_x')) == pytest.approx([0, 0.5, 0.5, 0.5, 0.5, 0, 0.5, 0])
+    assert list(reader.column('right_x')) == pytest.approx([0, 0, 0.4, 0.41, 0.41, 0.42, 0.43, 0])
+    assert [reader.mode_names[v] for v in reader.column('mode')] == [
+        'NEUTRAL', 'ARMED', 'ARMED', 'ARMED', 'CLICK_MODE', 'ARMED', 'ARMED', 'NEUTRAL']
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 2, 3, 5, 7, 8, 1 << 20])
+def test_stats_do_not_depend_on_chunk_size(session, chunk_rows):
+    stats = SessionAnalytics(MODE_NAMES, ACTION_NAMES)
+    stats.add_session(SessionReader(session), chunk_rows=chunk_rows)
+    s = stats.summary()
+
+    assert s['frames'] == 8
+    assert s['duration_s'] == pytest.approx(0.7)
+    assert s['hands']['none'] == pytest.approx(2 / 8)
+    assert s['hands']['left_only'] == pytest.approx(1 / 8)
+    assert s['hands']['right_only'] == pytest.approx(1 / 8)
+    assert s['hands']['both'] == pytest.approx(4 / 8)
+
+    modes = s['modes']
+    assert [modes[n]['frames'] for n in ('NEUTRAL', 'ARMED', 'CLICK_MODE')] == [2, 5, 1]
+    # Runs: NEUTRAL 0.1, ARMED 0.3, CLICK 0.1, ARMED 0.2, then NEUTRAL until the last frame
+    assert modes['ARMED']['runs'] == 2
+    assert modes['ARMED']['dwell_total_s'] == pytest.approx(0.5)
+    assert modes['ARMED']['dwell_max_s'] == pytest.approx(0.3)
+    assert modes['NEUTRAL']['runs'] == 2
+    assert modes['NEUTRAL']['dwell_total_s'] == pytest.approx(0.1)
+    assert modes['CLICK_MODE']['dwell_total_s'] == pytest.approx(0.1)
+
+    actions = s['actions']
+    assert [actions[n]['frames'] for n in ('IDLE', 'CURSOR', 'TAP')] == [3, 4, 1]
+    assert actions['CURSOR']['runs'] == 2
+    assert actions['CURSOR']['dwell_total_s'] == pytest.approx(0.4)
+    assert actions['IDLE']['dwell_total_s'] == pytest.approx(0.2)
+
+    m = MODE_NAMES.index
+    expected = [[0] * len(MODE_NAMES) for _ in MODE_NAMES]
+    for src, dst in [('NEUTRAL', 'ARMED'), ('ARMED', 'CLICK_MODE'), ('CLICK_MODE', 'ARMED'), ('ARMED', 'NEUTRAL')]:
+        expected[m(src)][m(dst)] = 1
+    assert s['mode_transitions'] == expected
+
+    a = ACTION_NAMES.index
+    expected = [[0] * len(ACTION_NAMES) for _ in ACTION_NAMES]
+    for src, dst in [('IDLE', 'CURSOR'), ('CURSOR', 'TAP'), ('TAP', 'CURSOR'), ('CURSOR', 'IDLE')]:
+        expected[a(src)][a(dst)] = 1
+    assert s['action_transitions'] == expected
+
+
+def test_runs_do_not_continue_across_sessions(session):
+    stats = SessionAnalytics(MODE_NAMES, ACTION_NAMES)
+    stats.add_session(SessionReader(session), chunk_rows=3)
+    stats.add_session(SessionReader(session), chunk_rows=3)
+    s = stats.summary()
+
+    assert s['sessions'] == 2
+    assert s['frames'] == 16
+    # The second session's leading NEUTRAL is a new run, not a NEUTRAL -> NEUTRAL continuation
+    assert s['modes']['NEUTRAL']['runs'] == 4
+    assert s['modes']['NEUTRAL']['dwell_total_s'] == pytest.approx(0.2)
+    assert s['mode_transitions'][MODE_NAMES.index('NEUTRAL')][MODE_NAMES.index('ARMED')] == 2
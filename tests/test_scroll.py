@@ -0,0 +1,160 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from input_device import VirtualMouse, RecordingBackend, REL_WHEEL_HI_RES, ecodes
+from scroll import ScrollEngine, ScrollState
+
+FPS = 30
+TICKS_PER_FRAME = 4 # 120 Hz wheel timer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def hi_res_units(events, since=None):
+    """Sum of REL_WHEEL_HI_RES values recorded after time `since`."""
+    return sum(value for ts, etype, code, value in events
+               if etype == ecodes.EV_REL and code == REL_WHEEL_HI_RES and (since is None or ts > since))
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def backend(clock):
+    return RecordingBackend(clock=clock)
+
+
+def make_engine(clock, backend, **kwargs):
+    engine = ScrollEngine(VirtualMouse(backend=backend), clock=clock, **kwargs)
+    engine.threaded = False # The test drives tick()
+    return engine
+
+
+def run(engine, clock, seconds, velocity=None, y=0.5):
+    """
+    Advance `seconds` at FPS, ticking the engine between frames.
+    With a velocity the hand moves at that speed (normalized units/s); returns its last y.
+    """
+    for _ in range(round(seconds * FPS)):
+        if velocity is not None:
+            engine.hand(y, clock.now)
+            y += velocity / FPS
+        for _ in range(TICKS_PER_FRAME):
+            clock.now += 1.0 / (FPS * TICKS_PER_FRAME)
+            engine.tick(clock.now)
+    return y
+
+
+def test_stop_emits_nothing_afterwards(clock, backend):
+    engine = make_engine(clock, backend)
+    run(engine, clock, 0.5, velocity=0.3)
+    assert hi_res_units(backend.events) > 0
+
+    engine.stop()
+    stopped_at = clock.now
+    run(engine, clock, 1.0)
+
+    assert engine.state == ScrollState.IDLE
+    assert hi_res_units(backend.events, since=stopped_at) == 0
+
+
+def test_coasting_decays_to_a_halt(clock, backend):
+    velocity, decay, deadband = 0.3, 0.35, 0.05
+    engine = make_engine(clock, backend, decay=decay, deadband=deadband)
+    run(engine, clock, 0.5, velocity=velocity)
+
+    engine.release()
+    released_at = clock.now
+    run(engine, clock, 2.0)
+
+    assert engine.state == ScrollState.IDLE
+    reports = [(ts, value) for ts, etype, code, value in backend.events
+               if code == REL_WHEEL_HI_RES and ts > released_at]
+    # Each report is smaller than the one before, and the last comes once speed drops below the deadband
+    values = [value for _, value in reports]
+    assert values == sorted(values, reverse=True)
+    assert reports[-1][0] - released_at < 1.0
+    # Velocity decays exponentially from `velocity` to `deadband`: decay * (v - deadband) of travel
+    expected = decay * (velocity - deadband) * engine.gain
+    assert hi_res_units(backend.events, since=released_at) == pytest.approx(expected, rel=0.03)
+
+
+def test_sub_unit_remainders_carry_over(clock, backend):
+    # 0.3 hi-res units per tick: no single tick has a whole unit to emit
+    velocity = 0.3
+    engine = make_engine(clock, backend, sensitivity=0.001, deadband=0.01)
+    run(engine, clock, 0.5, velocity=velocity) # Let the velocity filter settle
+    settled_at = clock.now
+    run(engine, clock, 2.0, velocity=velocity, y=0.5 + velocity * 0.5)
+
+    reports = [value for ts, etype, code, value in backend.events
+               if code == REL_WHEEL_HI_RES and ts > settled_at]
+    assert set(reports) == {1}
+    assert sum(reports) == pytest.approx(velocity * 2.0 * engine.gain, abs=1)
+
+
+def test_neutral_stops_scroll():
+    pytest.importorskip("numpy", reason="numpy is required by the filter")
+    pytest.importorskip("cv2", reason="OpenCV is required by the vision engine")
+
+    import config
+    from vision import VisionEngine
+    from filter import SignalFilter
+    from fsm import GestureFSM, LeftHandMode, RightHandAction
+    from controller import TrackpadController
+    from synthetic import SyntheticHandSource, Segment, HandPose, Line
+
+    def run_script(script):
+        """Drive the controller through `script`; return (recorded events, first NEUTRAL frame time after scrolling)."""
+        source = SyntheticHandSource(script, fps=FPS, loop=False)
+        vision = VisionEngine(mock_source=source)
+        backend = RecordingBackend(clock=lambda: source.timestamp)
+        controller = TrackpadController(GestureFSM(debounce_frames=config.DEBOUNCE_FRAMES),
+                                        SignalFilter.from_config(), VirtualMouse(backend=backend))
+        controller.scroll.threaded = False
+
+        neutral_at = None
+        scrolled = False
+        for ts, hands in source.frames():
+            left = vision.get_landmarks_dict(hands.get('Left'), config.WIDTH, config.HEIGHT)
+            right = vision.get_landmarks_dict(hands.get('Right'), config.WIDTH, config.HEIGHT)
+            mode, action = controller.update(left, right, timestamp=ts)
+            scrolled |= action == RightHandAction.SCROLL
+            if mode == LeftHandMode.NEUTRAL and scrolled and neutral_at is None:
+                neutral_at = ts
+            controller.scroll.tick(ts)
+        controller.close()
+        assert neutral_at is not None
+        return backend.events, neutral_at
+
+    scroll = Segment(1.0, left=HandPose.TWO_FINGERS, right=HandPose.POINT,
+                     right_path=Line((0.7, 0.2), (0.7, 0.6), 1.0))
+
+    # Left hand closes while the right hand is still scrolling
+    events, neutral_at = run_script([
+        scroll,
+        Segment(1.0, left=HandPose.FIST, right=HandPose.POINT, right_path=Line((0.7, 0.6), (0.7, 0.8), 0.5)),
+    ])
+    assert hi_res_units(events) != 0
+    assert hi_res_units(events, since=neutral_at) == 0
+
+    # Left hand closes while the scroll is coasting after the right hand left
+    events, neutral_at = run_script([
+        scroll,
+        Segment(0.15, left=HandPose.TWO_FINGERS),
+        Segment(1.0, left=HandPose.FIST),
+    ])
+    assert hi_res_units(events, since=scroll.duration) != hi_res_units(events, since=neutral_at) # Coasted
+    assert hi_res_units(events, since=neutral_at) == 0